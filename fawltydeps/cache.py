@@ -0,0 +1,681 @@
+"""Persistent caching of results between FawltyDeps runs."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import sysconfig
+import tempfile
+import time
+from contextlib import closing, suppress
+from importlib.machinery import EXTENSION_SUFFIXES
+from pathlib import Path
+from typing import (
+    AbstractSet,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+import isort
+
+from fawltydeps.types import (
+    CodeSource,
+    CustomMapping,
+    Location,
+    ParsedImport,
+    PathOrSpecial,
+)
+from fawltydeps.utils import dirs_between, version
+
+logger = logging.getLogger(__name__)
+
+# Files with these suffixes are recognized as (first-party) modules
+MODULE_SUFFIXES = (".py", *EXTENSION_SUFFIXES)
+
+# Directory entries with these suffixes hold the metadata of installed packages
+DIST_INFO_SUFFIXES = (".dist-info", ".egg-info")
+
+# The name, version and provided import names of an installed package
+DistDetails = Tuple[str, str, List[str]]
+
+# Each entry in the InstalledRequirementsCache contains this file
+INSTALLED_ENTRY_INFO = ".fawltydeps-entry.json"
+
+# Failed installations are recorded next to the entry path with this suffix
+FAILED_ENTRY_SUFFIX = ".failed"
+
+# Default time (in seconds) to remember that a requirement failed to install
+FAILED_INSTALL_TTL = 24 * 60 * 60
+
+# Temporary directories in the InstalledRequirementsCache use this prefix. Any
+# that are older than STALE_TEMP_DIR_AGE (in seconds) were left behind by runs
+# that were interrupted, and are removed by .evict().
+TEMP_DIR_PREFIX = ".tmp-"
+STALE_TEMP_DIR_AGE = 24 * 60 * 60
+
+
+def default_cache_dir() -> Path:
+    """Return the default directory for FawltyDeps' persistent caches.
+
+    This follows the XDG Base Directory Specification, i.e. we use
+    $XDG_CACHE_HOME/fawltydeps, or ~/.cache/fawltydeps if $XDG_CACHE_HOME is
+    not set.
+    """
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg_cache_home) if xdg_cache_home else Path.home() / ".cache"
+    return base / "fawltydeps"
+
+
+def cache_key(*parts: str) -> str:
+    """Return a short, filename-friendly digest of the given strings."""
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()[:16]
+
+
+def is_dist_info(package_dir: Path, name: str) -> bool:
+    """Return True if the entry with the given name in package_dir holds metadata.
+
+    Besides the *.dist-info and *.egg-info entries in a package directory, an
+    unpacked *.egg directory (which is itself put on sys.path) holds its
+    metadata in an EGG-INFO directory, as recognized by importlib_metadata.
+    """
+    name = name.lower()
+    return name.endswith(DIST_INFO_SUFFIXES) or (
+        name == "egg-info" and package_dir.name.lower().endswith(".egg")
+    )
+
+
+def write_atomically(path: Path, data: str) -> None:
+    """Write the given data to the given path, replacing it atomically.
+
+    This prevents concurrent FawltyDeps runs from seeing partial files.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+            tmp_file.write(data)
+        Path(tmp_name).replace(path)
+    except BaseException:
+        Path(tmp_name).unlink()
+        raise
+
+
+class FileIdentity(NamedTuple):
+    """Cheaply determine whether a file has changed, via stat() details."""
+
+    size: int
+    mtime_ns: int
+    inode: int
+
+    @classmethod
+    def from_path(cls, path: Path) -> FileIdentity:
+        """Construct FileIdentity for the given file path."""
+        stat = path.stat()
+        return cls(stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+
+class CacheEntry(NamedTuple):
+    """The cached imports of one file, with the details needed to validate them."""
+
+    identity: FileIdentity
+    digest: str  # hash of file contents, compared when .identity has changed
+    context: str  # fingerprint of the first-party context
+    imports: List[Tuple[str, Optional[int], Optional[int]]]  # name/cellno/lineno
+
+
+class ImportCache:
+    """Persistently cache the imports parsed from each code file.
+
+    Entries are keyed by the absolute path of each file, and are validated
+    by comparing the file's (size, mtime_ns, inode) from stat(). If these
+    differ, we fall back to comparing a hash of the file contents.
+
+    Whether an import is first- or third-party depends on what other modules
+    are found near the file, and on whether this is decided by isort (see
+    .context_fingerprint()), hence entries are also invalidated when this
+    first-party context changes.
+    """
+
+    def __init__(self, path: Path, *, use_isort: bool = False):
+        self.path = path
+        self.use_isort = use_isort
+        self.hits = 0
+        self.misses = 0
+        self._old: Dict[str, CacheEntry] = self._load()
+        self._new: Dict[str, CacheEntry] = {}
+        self._pending: Dict[CodeSource, Tuple[FileIdentity, str, str]] = {}
+        self._dir_fingerprints: Dict[Path, str] = {}
+
+    @staticmethod
+    def format_version() -> str:
+        """Return the version string that must match for cache entries to be valid.
+
+        Upgrading FawltyDeps or isort (which affect the parsing/classification
+        of imports) invalidates all entries.
+        """
+        return f"1/{version()}/{isort.__version__}"
+
+    @classmethod
+    def for_code_paths(
+        cls,
+        cache_dir: Path,
+        code_paths: Iterable[PathOrSpecial],
+        *,
+        use_isort: bool = False,
+    ) -> ImportCache:
+        """Create an ImportCache for parsing the given code paths.
+
+        We use a separate cache file for each distinct set of code paths (as
+        passed via Settings.code), in order to not accumulate entries from
+        unrelated projects in the same cache file.
+        """
+        key = cache_key(
+            *sorted(str(p.resolve() if isinstance(p, Path) else p) for p in code_paths)
+        )
+        return cls(cache_dir / f"imports-{key}.json", use_isort=use_isort)
+
+    def _load(self) -> Dict[str, CacheEntry]:
+        try:
+            with self.path.open(encoding="utf-8") as cache_file:
+                data = json.load(cache_file)
+            if data["version"] != self.format_version():
+                logger.debug(f"Ignoring outdated import cache at {self.path}")
+                return {}
+            return {
+                key: CacheEntry(FileIdentity(*identity), digest, context, imports)
+                for key, (identity, digest, context, imports) in data["files"].items()
+            }
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, TypeError, KeyError) as exc:
+            logger.debug(f"Ignoring unreadable import cache at {self.path}: {exc}")
+            return {}
+
+    def save(self) -> None:
+        """Write the entries that were used or added in this run to disk."""
+        logger.info(
+            f"Import cache: {self.hits} hits, {self.misses} misses ({self.path})"
+        )
+        data = {"version": self.format_version(), "files": self._new}
+        try:
+            write_atomically(self.path, json.dumps(data))
+        except OSError as exc:
+            logger.warning(f"Failed to write import cache to {self.path}: {exc}")
+
+    def _dir_fingerprint(self, dir_path: Path) -> str:
+        """Summarize the names that could be imported from the given directory."""
+        if dir_path not in self._dir_fingerprints:
+            try:
+                with os.scandir(dir_path) as entries:
+                    names = sorted(
+                        entry.name
+                        for entry in entries
+                        if entry.is_dir() or entry.name.endswith(MODULE_SUFFIXES)
+                    )
+            except OSError:
+                names = []
+            self._dir_fingerprints[dir_path] = cache_key(str(dir_path), *names)
+        return self._dir_fingerprints[dir_path]
+
+    def context_fingerprint(self, src: CodeSource) -> str:
+        """Summarize the first-party context used to classify imports in 'src'.
+
+        This mirrors the isort configuration that is set up for 'src' by
+        extract_imports.parse_source(): The modules and packages found in the
+        directories between the base_dir and the parent dir of the code file
+        are considered first-party. Classifying imports with isort instead of
+        our own ImportClassifier logic gives a different context.
+        """
+        assert isinstance(src.path, Path)  # noqa: S101, sanity check
+        if src.base_dir is None:
+            src_paths = [Path(), src.path.parent]
+        else:
+            src_paths = [src.base_dir, *dirs_between(src.base_dir, src.path.parent)]
+        return cache_key(
+            f"use_isort={self.use_isort}",
+            *(self._dir_fingerprint(p.resolve()) for p in src_paths),
+        )
+
+    def lookup(self, src: CodeSource) -> Optional[List[ParsedImport]]:
+        """Return the cached imports for the given source, or None on a miss.
+
+        After a miss, the caller is expected to parse the source and pass the
+        result to .store().
+        """
+        assert isinstance(src.path, Path)  # noqa: S101, sanity check
+        key = str(src.path.resolve())
+        identity = FileIdentity.from_path(src.path)
+        context = self.context_fingerprint(src)
+        digest = None
+        entry = self._old.get(key)
+        if entry is not None and entry.context == context:
+            if entry.identity != identity:  # file may have changed
+                digest = hashlib.sha256(src.path.read_bytes()).hexdigest()
+            if digest is None or digest == entry.digest:
+                self.hits += 1
+                self._new[key] = entry._replace(identity=identity)
+                return [
+                    ParsedImport(name, Location(src.path, cellno, lineno))
+                    for name, cellno, lineno in entry.imports
+                ]
+        if digest is None:
+            digest = hashlib.sha256(src.path.read_bytes()).hexdigest()
+        self.misses += 1
+        self._pending[src] = (identity, digest, context)
+        return None
+
+    def store(self, src: CodeSource, imports: List[ParsedImport]) -> None:
+        """Record the parsed imports for a source that missed in .lookup().
+
+        Storing the same source more than once (e.g. when it was passed twice
+        to the parser) has no further effect.
+        """
+        assert isinstance(src.path, Path)  # noqa: S101, sanity check
+        pending = self._pending.pop(src, None)
+        if pending is None:
+            return
+        identity, digest, context = pending
+        key = str(src.path.resolve())
+        self._new[key] = CacheEntry(
+            identity,
+            digest,
+            context,
+            [(imp.name, imp.source.cellno, imp.source.lineno) for imp in imports],
+        )
+
+
+class PackageDirIndex:
+    """Persistently cache the packages installed in one package directory.
+
+    A package directory (e.g. a site-packages directory) contains a
+    *.dist-info (or *.egg-info) entry for each installed package. Reading the
+    metadata of all these packages is costly, hence we cache the details of
+    each package, keyed by the name of its metadata entry.
+
+    The whole index is reused as long as the modification time of the package
+    directory and the set of metadata entries are unchanged. Otherwise, only
+    packages whose metadata entry was added or modified since the last run are
+    read again.
+    """
+
+    def __init__(self, path: Path, package_dir: Path):
+        self.path = path
+        self.package_dir = package_dir
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def format_version() -> str:
+        """Return the version string that must match for the index to be valid."""
+        return f"1/{version()}"
+
+    @classmethod
+    def for_package_dir(cls, cache_dir: Path, package_dir: Path) -> PackageDirIndex:
+        """Create a PackageDirIndex for the given package directory."""
+        key = cache_key(str(package_dir.resolve()))
+        return cls(cache_dir / f"packages-{key}.json", package_dir)
+
+    def _load(self) -> Tuple[Optional[int], Dict[str, Tuple[int, DistDetails]]]:
+        try:
+            with self.path.open(encoding="utf-8") as cache_file:
+                data = json.load(cache_file)
+            if data["version"] != self.format_version():
+                logger.debug(f"Ignoring outdated package index at {self.path}")
+                return None, {}
+            return data["mtime_ns"], {
+                name: (mtime_ns, (dist_name, dist_version, imports))
+                for name, (mtime_ns, dist_name, dist_version, imports) in data[
+                    "dists"
+                ].items()
+            }
+        except FileNotFoundError:
+            return None, {}
+        except (OSError, ValueError, TypeError, KeyError) as exc:
+            logger.debug(f"Ignoring unreadable package index at {self.path}: {exc}")
+            return None, {}
+
+    def _save(self, mtime_ns: int, dists: Dict[str, Tuple[int, DistDetails]]) -> None:
+        data = {
+            "version": self.format_version(),
+            "mtime_ns": mtime_ns,
+            "dists": {
+                name: [mtime, *details] for name, (mtime, details) in dists.items()
+            },
+        }
+        try:
+            write_atomically(self.path, json.dumps(data))
+        except OSError as exc:
+            logger.warning(f"Failed to write package index to {self.path}: {exc}")
+
+    def dists(self, read_dist: Callable[[Path], DistDetails]) -> List[DistDetails]:
+        """Return the details of the packages in this package directory.
+
+        The order of the returned packages follows the order of the metadata
+        entries in the directory listing. Packages that are not found in the
+        index are read by passing the path of their metadata entry to
+        read_dist(), and the index is updated on disk afterwards.
+        """
+        mtime_ns = self.package_dir.stat().st_mtime_ns
+        with os.scandir(self.package_dir) as entries:
+            dist_entries = [
+                entry for entry in entries if is_dist_info(self.package_dir, entry.name)
+            ]
+        old_mtime_ns, old = self._load()
+        if mtime_ns == old_mtime_ns and {e.name for e in dist_entries} == old.keys():
+            self.hits += len(old)
+            return [details for _mtime, details in old.values()]
+
+        new: Dict[str, Tuple[int, DistDetails]] = {}
+        for entry in dist_entries:
+            entry_mtime_ns = entry.stat().st_mtime_ns
+            cached = old.get(entry.name)
+            if cached is not None and cached[0] == entry_mtime_ns:
+                self.hits += 1
+                new[entry.name] = cached
+            else:
+                self.misses += 1
+                new[entry.name] = (entry_mtime_ns, read_dist(Path(entry.path)))
+        logger.info(
+            f"Package index: {self.hits} hits, {self.misses} misses ({self.path})"
+        )
+        self._save(mtime_ns, new)
+        return [details for _mtime, details in new.values()]
+
+
+def dir_size(path: Path) -> int:
+    """Return the total size (in bytes) of the files under the given directory."""
+    return sum(
+        (Path(dirpath) / filename).lstat().st_size
+        for dirpath, _dirnames, filenames in os.walk(path)
+        for filename in filenames
+    )
+
+
+class InstalledRequirementsCache:
+    """Persistently cache the packages installed for each requirement.
+
+    Each requirement is installed (e.g. with `pip install --target`) into its
+    own directory, keyed by the requirement string, the Python version and the
+    platform. Later runs can then find the installed package without having to
+    install it again.
+
+    Each entry records its size, and the modification time of its info file
+    tracks when it was last used. When the total size of the cached entries
+    exceeds max_size (in bytes), the least recently used entries are evicted.
+
+    Requirements that fail to install are also recorded, so that we do not try
+    (and fail) to install them again on every run. These records expire after
+    failed_ttl seconds. With failed_ttl <= 0, failures are not recorded at all.
+    """
+
+    def __init__(self, path: Path, max_size: int, failed_ttl: int = FAILED_INSTALL_TTL):
+        self.path = path
+        self.max_size = max_size
+        self.failed_ttl = failed_ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def format_version() -> str:
+        """Return the version string that is part of each entry's key."""
+        return "1"
+
+    @classmethod
+    def in_cache_dir(
+        cls, cache_dir: Path, max_size: int, failed_ttl: int = FAILED_INSTALL_TTL
+    ) -> InstalledRequirementsCache:
+        """Create an InstalledRequirementsCache inside the given cache directory."""
+        return cls(cache_dir / "installed", max_size, failed_ttl)
+
+    def entry_path(self, requirement: str) -> Path:
+        """Return the directory where the given requirement is cached."""
+        key = cache_key(
+            self.format_version(),
+            requirement,
+            sys.implementation.cache_tag or sys.implementation.name,
+            sysconfig.get_platform(),
+        )
+        return self.path / key
+
+    def lookup(self, requirement: str) -> Optional[Path]:
+        """Return the cached entry for the given requirement, or None on a miss.
+
+        A hit marks the entry as recently used.
+        """
+        path = self.entry_path(requirement)
+        try:
+            os.utime(path / INSTALLED_ENTRY_INFO)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def _failed_path(self, requirement: str) -> Path:
+        path = self.entry_path(requirement)
+        return path.with_name(path.name + FAILED_ENTRY_SUFFIX)
+
+    def recently_failed(self, requirement: str) -> bool:
+        """Return True if the given requirement failed to install recently."""
+        if self.failed_ttl <= 0:
+            return False
+        try:
+            failed_at = self._failed_path(requirement).stat().st_mtime
+        except FileNotFoundError:
+            return False
+        return time.time() - failed_at < self.failed_ttl
+
+    def add_failure(self, requirement: str) -> None:
+        """Record that the given requirement failed to install."""
+        if self.failed_ttl <= 0:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._failed_path(requirement).touch()
+
+    def temp_dir(self) -> tempfile.TemporaryDirectory[str]:
+        """Return a temporary directory inside the cache directory.
+
+        Files installed here can be moved into cache entries without copying.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        return tempfile.TemporaryDirectory(dir=self.path, prefix=TEMP_DIR_PREFIX)
+
+    def add(self, requirement: str, install: Callable[[Path], bool]) -> Optional[Path]:
+        """Install the given requirement into a new cache entry.
+
+        install() is called with the (temporary) directory to install into, and
+        returns True on success. The entry is then moved into place atomically.
+        Return the path to the new entry, or None if installation failed (in
+        which case the failure is recorded).
+        """
+        path = self.entry_path(requirement)
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp_path = Path(tempfile.mkdtemp(dir=self.path, prefix=TEMP_DIR_PREFIX))
+        try:
+            if not install(tmp_path):
+                self.add_failure(requirement)
+                return None
+            info = {"requirement": requirement, "size": dir_size(tmp_path)}
+            (tmp_path / INSTALLED_ENTRY_INFO).write_text(json.dumps(info))
+            try:
+                tmp_path.rename(path)
+            except OSError as exc:
+                if not (path / INSTALLED_ENTRY_INFO).is_file():
+                    logger.warning(f"Failed to cache {requirement!r} in {path}: {exc}")
+                    return None
+                # Otherwise, another run just added the same entry
+            with suppress(FileNotFoundError):
+                self._failed_path(requirement).unlink()
+            return path
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def _remove_stale(self, dir_entry: os.DirEntry[str], now: float) -> None:
+        """Remove expired failure records and abandoned temporary directories."""
+        if dir_entry.name.endswith(FAILED_ENTRY_SUFFIX):
+            max_age, remove = max(self.failed_ttl, 0), os.unlink
+        elif dir_entry.name.startswith(TEMP_DIR_PREFIX):
+            max_age, remove = STALE_TEMP_DIR_AGE, shutil.rmtree
+        else:
+            return
+        with suppress(OSError):  # e.g. removed concurrently by another run
+            if now - dir_entry.stat(follow_symlinks=False).st_mtime >= max_age:
+                logger.debug(f"Removing stale {dir_entry.path} from the cache")
+                remove(dir_entry.path)
+
+    def evict(self, keep: AbstractSet[Path] = frozenset()) -> None:
+        """Evict the least recently used entries until we are within max_size.
+
+        Entries in 'keep' (e.g. those that are used by the current run) are
+        never evicted. Also remove expired failure records, and temporary
+        directories left behind by interrupted runs.
+        """
+        now = time.time()
+        entries: List[Tuple[int, int, Path]] = []  # (last used, size, path)
+        with os.scandir(self.path) as dir_entries:
+            for dir_entry in dir_entries:
+                self._remove_stale(dir_entry, now)
+                info_path = Path(dir_entry.path, INSTALLED_ENTRY_INFO)
+                try:
+                    last_used = info_path.stat().st_mtime_ns
+                    size = json.loads(info_path.read_text())["size"]
+                except (OSError, ValueError, TypeError, KeyError):
+                    continue  # not a (complete) entry
+                entries.append((last_used, size, Path(dir_entry.path)))
+
+        total_size = sum(size for _last_used, size, _path in entries)
+        for _last_used, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            if path in keep:
+                continue
+            logger.debug(f"Evicting {path} from the installed requirements cache")
+            shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
+
+
+class CompiledMapping:
+    """Persistently store a custom mapping file in an indexed SQLite database.
+
+    Parsing a large mapping file (TOML) on every run is costly, when we only
+    need the entries for a few packages. Hence, we compile the mapping file
+    into a table that is indexed by a key derived from each package name, and
+    query only the keys that we need.
+
+    The mapping file remains the source of truth: The compiled database
+    records the FileIdentity of the mapping file it was built from, and is
+    rebuilt whenever this no longer matches.
+    """
+
+    # SQLite limits the number of parameters in a single query
+    MAX_QUERY_PARAMS = 500
+
+    def __init__(self, path: Path, mapping_path: Path):
+        self.path = path
+        self.mapping_path = mapping_path
+
+    @staticmethod
+    def format_version() -> str:
+        """Return the version string that must match for the database to be valid."""
+        return f"1/{version()}"
+
+    @classmethod
+    def for_mapping_file(cls, cache_dir: Path, mapping_path: Path) -> CompiledMapping:
+        """Create a CompiledMapping for the given mapping file."""
+        key = cache_key(str(mapping_path.resolve()))
+        return cls(cache_dir / f"mapping-{key}.sqlite", mapping_path)
+
+    def _source(self) -> str:
+        """Describe the mapping file that a valid database must be built from."""
+        identity = FileIdentity.from_path(self.mapping_path)
+        return json.dumps([self.format_version(), *identity])
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the existing database read-only, without creating it if missing."""
+        return sqlite3.connect(f"{self.path.absolute().as_uri()}?mode=ro", uri=True)
+
+    def _is_fresh(self, source: str) -> bool:
+        try:
+            with closing(self._connect()) as db:
+                (stored,) = db.execute("SELECT source FROM meta").fetchone()
+        except (sqlite3.Error, TypeError, ValueError):
+            return False
+        return bool(stored == source)
+
+    def _compile(
+        self,
+        source: str,
+        load: Callable[[Path], CustomMapping],
+        key: Callable[[str], str],
+    ) -> None:
+        """(Re)build the database from the mapping file, replacing it atomically."""
+        logger.debug(f"Compiling {self.mapping_path} into {self.path}")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}."
+        )
+        os.close(fd)
+        try:
+            with closing(sqlite3.connect(tmp_name)) as db:
+                db.execute("CREATE TABLE meta (source TEXT)")
+                db.execute("INSERT INTO meta VALUES (?)", (source,))
+                db.execute("CREATE TABLE mapping (key TEXT, name TEXT, imports TEXT)")
+                db.executemany(
+                    "INSERT INTO mapping VALUES (?, ?, ?)",
+                    (
+                        (key(name), name, json.dumps(imports))
+                        for name, imports in load(self.mapping_path).items()
+                    ),
+                )
+                db.execute("CREATE INDEX mapping_key ON mapping (key)")
+                db.commit()
+            Path(tmp_name).replace(self.path)
+        except BaseException:
+            Path(tmp_name).unlink()
+            raise
+
+    def lookup(
+        self,
+        keys: AbstractSet[str],
+        load: Callable[[Path], CustomMapping],
+        key: Callable[[str], str],
+    ) -> CustomMapping:
+        """Return the entries of the mapping file whose key(name) is in 'keys'.
+
+        If the database is missing or stale, it is first rebuilt by passing the
+        mapping file path to load(). Entries are returned in the same order as
+        in the mapping file.
+        """
+        source = self._source()
+        try:
+            if not self._is_fresh(source):
+                self._compile(source, load, key)
+            rows: List[Tuple[int, str, str]] = []
+            query_keys = sorted(keys)
+            with closing(self._connect()) as db:
+                for i in range(0, len(query_keys), self.MAX_QUERY_PARAMS):
+                    chunk = query_keys[i : i + self.MAX_QUERY_PARAMS]
+                    placeholders = ", ".join("?" * len(chunk))  # no user data
+                    query = (
+                        "SELECT rowid, name, imports FROM mapping"  # noqa: S608
+                        f" WHERE key IN ({placeholders})"
+                    )
+                    rows.extend(db.execute(query, chunk))
+        except (OSError, sqlite3.Error) as exc:
+            logger.warning(f"Failed to use compiled mapping at {self.path}: {exc}")
+            return {
+                name: imports
+                for name, imports in load(self.mapping_path).items()
+                if key(name) in keys
+            }
+        return {name: json.loads(imports) for _rowid, name, imports in sorted(rows)}
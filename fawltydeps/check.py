@@ -2,9 +2,9 @@
 
 import logging
 from itertools import groupby
-from typing import Dict, List
+from typing import Dict, List, Optional, Set
 
-from fawltydeps.packages import Package
+from fawltydeps.packages import Package, import_providers
 from fawltydeps.settings import Settings
 from fawltydeps.types import (
     DeclaredDependency,
@@ -45,19 +45,24 @@ def calculate_unused(
     declared_deps: List[DeclaredDependency],
     resolved_deps: Dict[str, Package],
     settings: Settings,
+    providers: Optional[Dict[str, Set[str]]] = None,
 ) -> List[UnusedDependency]:
     """Calculate which declared dependencies have no corresponding imports.
 
     Return a list of UnusedDependency objects that represent the dependencies in
     'declared_deps' for which none of the provided import names (found via
     'resolved_deps') are present in the list of actual 'imports'.
+
+    'providers' is the result of import_providers(resolved_deps), and is
+    calculated here if not given.
     """
-    imported_names = {i.name for i in imports}
+    if providers is None:
+        providers = import_providers(resolved_deps)
+    used_deps = {dep_name for i in imports for dep_name in providers.get(i.name, set())}
     unused = [
         dep
         for dep in declared_deps
-        if (dep.name not in settings.ignore_unused)
-        and not resolved_deps[dep.name].is_used(imported_names)
+        if (dep.name not in settings.ignore_unused) and dep.name not in used_deps
     ]
     unused.sort(key=lambda dep: dep.name)  # groupby requires pre-sorting
     return [
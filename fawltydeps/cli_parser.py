@@ -8,6 +8,7 @@ import argparse
 from pathlib import Path
 from typing import Any, Optional, Sequence
 
+from fawltydeps.cache import default_cache_dir
 from fawltydeps.settings import (
     Action,
     ParserChoice,
@@ -212,6 +213,15 @@ def populate_parser_paths_options(parser: argparse._ActionsContainer) -> None:
             " separate temporary virtualenv to discover the imports they expose."
         ),
     )
+    parser.add_argument(
+        "--wheelhouse",
+        type=Path,
+        metavar="DIR",
+        help=(
+            "Directory of wheel files (e.g. from `pip wheel`) to read the imports"
+            " exposed by declared dependencies from, without installing them."
+        ),
+    )
     parser.add_argument(
         "--custom-mapping-file",
         nargs="+",
@@ -260,6 +270,70 @@ def populate_parser_configuration(parser: argparse._ActionsContainer) -> None:
             " e.g. --ignore-unused pylint black some_other_module"
         ),
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        metavar="N",
+        help=(
+            "Number of parallel processes to use when parsing code for imports,"
+            " and of threads to use when listing directories and when looking up"
+            " packages in multiple Python environments (default: 1, i.e. work"
+            " serially)"
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        nargs="?",
+        type=Path,
+        const=default_cache_dir(),
+        metavar="DIR",
+        help=(
+            "Cache results (e.g. parsed imports) in DIR, to speed up subsequent"
+            f" runs. DIR defaults to {default_cache_dir()}. By default, nothing"
+            " is cached."
+        ),
+    )
+    parser.add_argument(
+        "--max-install-cache-size",
+        type=int,
+        metavar="MIB",
+        help=(
+            "Maximum size (in MiB) of the packages that --install-deps keeps"
+            " installed under --cache-dir. The least recently used packages are"
+            " removed when this is exceeded (default: 1024)"
+        ),
+    )
+    parser.add_argument(
+        "--failed-install-ttl",
+        type=int,
+        metavar="HOURS",
+        help=(
+            "Do not retry packages that failed to install under --cache-dir"
+            " within the last HOURS hours. Pass 0 to retry them now"
+            " (default: 24)"
+        ),
+    )
+    parser.add_argument(
+        "--use-isort",
+        dest="use_isort",
+        action="store_true",
+        help=(
+            "Use isort to tell first-party and stdlib imports from third-party"
+            " imports. This is slower than FawltyDeps' own classification, and"
+            " mostly useful for comparing the two."
+        ),
+    )
+    parser.add_argument(
+        "--use-git-index",
+        dest="use_git_index",
+        action="store_true",
+        help=(
+            "Inside a git work tree, find code and dependency declarations among"
+            " the files known to git (tracked files, and untracked files that"
+            " are not ignored), instead of traversing directories."
+        ),
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -4,9 +4,11 @@ from __future__ import annotations
 
 import logging
 import os
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from functools import lru_cache
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from typing import (
     Dict,
     FrozenSet,
@@ -16,12 +18,12 @@ from typing import (
     NamedTuple,
     Optional,
     Set,
+    Tuple,
     TypeVar,
 )
 
 from fawltydeps.gitignore_parser import Rule as ExcludeRule
-from fawltydeps.gitignore_parser import match_rules, parse_gitignore
-from fawltydeps.utils import dirs_between
+from fawltydeps.gitignore_parser import RuleSet, parse_gitignore
 
 T = TypeVar("T")
 
@@ -57,6 +59,117 @@ class DirId(NamedTuple):
         return cls.from_abs_path(path)
 
 
+# Subdirs (with their DirIds, in listing order) and files within a directory
+ScanResult = Tuple[Dict[Path, DirId], Set[Path]]
+
+# Where to find the mount table of the current process (Linux only)
+MOUNTINFO_PATH = Path("/proc/self/mountinfo")
+
+# The root directory of a btrfs subvolume always has this inode number. Each
+# subvolume has its own device number, but need not be a mount point.
+BTRFS_SUBVOLUME_INO = 256
+
+# File systems where the inode numbers listed for a directory may not match
+# those returned by stat() (e.g. overlayfs with layers on different devices).
+UNRELIABLE_INODE_FS_TYPES = frozenset(["overlay"])
+
+
+class Mount(NamedTuple):
+    """One line of the mount table, as found in /proc/self/mountinfo."""
+
+    mount_id: str
+    parent_id: str
+    dev: int
+    mount_point: str
+    fs_type: str
+
+    @classmethod
+    def parse(cls, line: str) -> Mount:
+        """Parse one line of the mount table.
+
+        Each line starts with the mount ID, parent ID, major:minor, root and
+        mount point fields, and some optional fields. After a " - " separator
+        come the file system type, and some more fields.
+        """
+        fields, _sep, fs_fields = line.partition(" - ")
+        mount_id, parent_id, major_minor, _root, mount_point = fields.split()[:5]
+        major, minor = major_minor.split(":")
+        # Special characters in mount points are escaped as octal, e.g. \\040
+        mount_point = re.sub(r"\\([0-7]{3})", lambda m: chr(int(m[1], 8)), mount_point)
+        return cls(
+            mount_id,
+            parent_id,
+            os.makedev(int(major), int(minor)),
+            mount_point,
+            fs_fields.split(" ", 1)[0],
+        )
+
+
+@dataclass(frozen=True)
+class MountTable:
+    """The names of the mount points found on each device.
+
+    A subdirectory normally lives on the same device as its parent, and can be
+    identified by the parent's device and the inode number found in the parent
+    directory listing, without calling stat(). This table tells us when that
+    shortcut does not apply, i.e. when a subdirectory may be a mount point or
+    the root of a btrfs subvolume.
+    """
+
+    mount_names: Dict[int, FrozenSet[str]]  # device -> names of mount points on it
+    btrfs_devs: FrozenSet[int]
+
+    @classmethod
+    def read(cls, path: Path = MOUNTINFO_PATH) -> Optional[MountTable]:
+        """Read the mount table from the given mountinfo file.
+
+        Return None if the mount table is not available (e.g. not on Linux).
+        """
+        try:
+            with path.open(encoding="utf-8", errors="surrogateescape") as f:
+                mounts = {mount.mount_id: mount for mount in map(Mount.parse, f)}
+        except (OSError, ValueError) as exc:
+            logger.debug("Cannot read mount table from %s: %s", path, exc)
+            return None
+
+        mount_names: Dict[int, Set[str]] = {
+            mount.dev: set() for mount in mounts.values()
+        }
+        for mount in mounts.values():
+            parent = mounts.get(mount.parent_id)
+            name = PurePosixPath(mount.mount_point).name
+            if parent is not None and name:
+                mount_names[parent.dev].add(name)
+        # Leave out devices whose inode numbers we cannot rely on
+        unreliable = {
+            mount.dev
+            for mount in mounts.values()
+            if mount.fs_type in UNRELIABLE_INODE_FS_TYPES
+        }
+        return cls(
+            mount_names={
+                dev: frozenset(names)
+                for dev, names in mount_names.items()
+                if dev not in unreliable
+            },
+            btrfs_devs=frozenset(
+                mount.dev for mount in mounts.values() if mount.fs_type == "btrfs"
+            ),
+        )
+
+    def may_change_device(self, dev: int, entry: os.DirEntry[str]) -> bool:
+        """Return True if 'entry' may not be on 'dev', the device of its parent.
+
+        This is also the case when we know nothing about the given device.
+        """
+        names = self.mount_names.get(dev)
+        return (
+            names is None
+            or entry.name in names
+            or (dev in self.btrfs_devs and entry.inode() == BTRFS_SUBVOLUME_INO)
+        )
+
+
 @dataclass(frozen=True, order=True)
 class TraversalStep(Generic[T]):
     """Encapsulate a single step/directory in an ongoing directory traversal.
@@ -105,12 +218,22 @@ class DirectoryTraversal(Generic[T]):
     remain unchanged during traversal. I.e. adding new entries to a directory
     that has otherwise already been traversed will not cause it to traversed
     again.
+
+    With jobs > 1, subdirectories are listed ahead of time on a pool of 'jobs'
+    threads, which helps on file systems where each directory listing incurs
+    a round trip (e.g. network file systems). The traversal steps are still
+    yielded in the same order as with jobs = 1.
     """
 
     to_traverse: Dict[Path, DirId] = field(default_factory=dict)
     skip_dirs: Set[DirId] = field(default_factory=set)  # includes already-traversed
     attached: Dict[DirId, List[T]] = field(default_factory=dict)
     exclude_rules: List[ExcludeRule] = field(default_factory=list)
+    jobs: int = 1
+    # Compiled from .exclude_rules on demand, reset by .exclude*() below
+    _exclude_rule_set: Optional[RuleSet] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def add(self, dir_path: Path, *attach_data: T) -> None:
         """Add one directory to this traversal, optionally w/attached data.
@@ -155,11 +278,12 @@ class DirectoryTraversal(Generic[T]):
         Files that match an exclude pattern will not be part of the step.files
         returned while traversing the parent.
         """
-        logger.debug(f"Parsing rule from pattern {pattern!r}")
+        logger.debug("Parsing rule from pattern %r", pattern)
         rule = ExcludeRule.from_pattern(pattern.rstrip("\n"), base_dir)
 
-        logger.debug(f"Adding rule {rule!r} @ {rule.base_dir!r}")
+        logger.debug("Adding rule %r @ %r", rule, rule.base_dir)
         self.exclude_rules.append(rule)
+        self._exclude_rule_set = None
 
     def exclude_from(self, file_with_exclude_patterns: Path) -> None:
         """Read exclude patterns from the given file and add to this traversal.
@@ -176,10 +300,13 @@ class DirectoryTraversal(Generic[T]):
         self.exclude_rules = (
             list(parse_gitignore(file_with_exclude_patterns)) + self.exclude_rules
         )
+        self._exclude_rule_set = None
 
     def is_excluded(self, path: Path, *, is_dir: bool) -> bool:
         """Check if given path is excluded by any of our exclude rules."""
-        return match_rules(self.exclude_rules, path, is_dir=is_dir)
+        if self._exclude_rule_set is None:
+            self._exclude_rule_set = RuleSet(self.exclude_rules)
+        return self._exclude_rule_set.match(path, is_dir=is_dir)
 
     def traverse(self) -> Iterator[TraversalStep[T]]:
         """Perform the traversal of the added directories.
@@ -194,6 +321,9 @@ class DirectoryTraversal(Generic[T]):
         - An ordered list of attached data items, for each of the directory
           levels starting at the base directory (the top-most parent directory
           passed to .add()), up to and including the current directory.
+          (The data attached to each directory is collected when that directory
+          is traversed, and passed on to its subdirectories from there. Data
+          attached to a directory that has already been traversed is ignored.)
         - The set of excluded subdirs.
         - The set of excluded files.
 
@@ -201,51 +331,87 @@ class DirectoryTraversal(Generic[T]):
         nor will a directory previously traversed by this instance be traversed
         again.
         """
-
-        def accumulate_attached_data(parent_dir: Path, child_dir: Path) -> Iterator[T]:
-            """Yield attached data items for child_dir (starting from parent_dir).
-
-            For each directory level from parent_dir to child_dir (inclusive),
-            yield each attached data item in the order they were attached.
-            """
-            for dir_path in reversed(list(dirs_between(parent_dir, child_dir))):
-                yield from self.attached.get(DirId.from_path(dir_path), [])
-
-        while True:
-            remaining = {
-                path: dir_id
-                for path, dir_id in self.to_traverse.items()
-                if dir_id not in self.skip_dirs
-            }
-            if not remaining:  # nothing left to do
-                break
-            logger.debug(f"Left to traverse: {remaining}")
-            base_dir = min(remaining.keys())
-            assert base_dir.is_dir()  # noqa: S101, sanity check
-            for cur, subdirs, filenames in os.walk(base_dir, followlinks=True):
-                cur_dir = Path(cur)
-                cur_id = DirId.from_path(cur_dir)
+        mounts = MountTable.read()
+        executor = ThreadPoolExecutor(self.jobs) if self.jobs > 1 else None
+        try:
+            while True:
+                remaining = {
+                    path: dir_id
+                    for path, dir_id in self.to_traverse.items()
+                    if dir_id not in self.skip_dirs
+                }
+                if not remaining:  # nothing left to do
+                    break
+                logger.debug("Left to traverse: %s", remaining)
+                base_dir = min(remaining.keys())
+                assert base_dir.is_dir()  # noqa: S101, sanity check
+                yield from self._walk(
+                    base_dir,
+                    remaining[base_dir],
+                    set(remaining.values()),
+                    mounts,
+                    executor,
+                )
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def _walk(  # noqa: PLR0913
+        self,
+        base_dir: Path,
+        base_id: DirId,
+        remaining_ids: Set[DirId],
+        mounts: Optional[MountTable],
+        executor: Optional[ThreadPoolExecutor],
+    ) -> Iterator[TraversalStep[T]]:
+        """Traverse the given base_dir and the directories below it.
+
+        This is a depth-first, top-down walk (like os.walk(followlinks=True)),
+        with a stack of directories still to be visited. Each directory is
+        pushed along with the data accumulated by its parents, so that we never
+        need to look back up the directory tree.
+
+        If an executor is given, the subdirs of each traversed directory that
+        were not skipped by the caller are listed in the background, while the
+        caller processes the steps that come before them.
+        """
+        to_visit: List[Tuple[Path, DirId, List[T]]] = [(base_dir, base_id, [])]
+        prefetched: Dict[Path, Future[Optional[ScanResult]]] = {}
+        try:
+            while to_visit:
+                cur_dir, cur_id, parent_attached = to_visit.pop()
+                future = prefetched.pop(cur_dir, None)
                 if cur_id in self.skip_dirs:
-                    logger.debug(f"  Ignoring {cur_dir}")
-                    subdirs[:] = []  # don't recurse into subdirs
+                    logger.debug("  Ignoring %s", cur_dir)
+                    if future is not None:
+                        future.cancel()
                     continue  # skip to next
+                scanned = (
+                    self._scan_dir(cur_dir, cur_id, mounts)
+                    if future is None
+                    else future.result()
+                )
+                if scanned is None:  # unreadable, ignored like os.walk() does
+                    continue
+                subdirs, file_paths = scanned
 
-                logger.debug(f"  Traversing {cur_dir}: {cur_id}")
+                logger.debug("  Traversing %s: %s", cur_dir, cur_id)
                 self.skip_dirs.add(cur_id)  # don't traverse this dir again
-
-                subdir_paths = {cur_dir / subdir for subdir in subdirs}
-                file_paths = {cur_dir / filename for filename in filenames}
+                own_attached = self.attached.get(cur_id)
+                attached = (
+                    parent_attached + own_attached if own_attached else parent_attached
+                )
 
                 # Process excludes
                 exclude_subdirs = {
                     path
-                    for path in subdir_paths
+                    for path, subdir_id in subdirs.items()
                     if self.is_excluded(path, is_dir=True)
-                    and (DirId.from_path(path) not in remaining.values())
+                    and subdir_id not in remaining_ids
                 }
                 for subdir in exclude_subdirs:
-                    logger.debug(f"    skip traversing excluded subdir {subdir}")
-                    self.skip_dir(subdir)
+                    logger.debug("    skip traversing excluded subdir %s", subdir)
+                    self.skip_dirs.add(subdirs[subdir])
                 exclude_files = {
                     path for path in file_paths if self.is_excluded(path, is_dir=False)
                 }
@@ -255,9 +421,66 @@ class DirectoryTraversal(Generic[T]):
                 # .exclude()). We cannot assume anything about their state here.
                 yield TraversalStep(
                     cur_dir,
-                    frozenset(subdir_paths - exclude_subdirs),
+                    frozenset(subdirs.keys() - exclude_subdirs),
                     frozenset(file_paths - exclude_files),
-                    list(accumulate_attached_data(base_dir, cur_dir)),
+                    list(attached),
                     frozenset(exclude_subdirs),
                     frozenset(exclude_files),
                 )
+
+                # Visit subdirs in the order they were listed. Whether they
+                # are skipped is decided when they are popped off the stack.
+                to_visit.extend(
+                    (subdir, subdir_id, attached)
+                    for subdir, subdir_id in reversed(list(subdirs.items()))
+                )
+                if executor is not None:
+                    for subdir, subdir_id in subdirs.items():
+                        if subdir_id not in self.skip_dirs:
+                            prefetched[subdir] = executor.submit(
+                                self._scan_dir, subdir, subdir_id, mounts
+                            )
+        finally:
+            for future in prefetched.values():
+                future.cancel()
+
+    @staticmethod
+    def _scan_dir(
+        dir_path: Path, dir_id: DirId, mounts: Optional[MountTable]
+    ) -> Optional[ScanResult]:
+        """List the subdirectories and files within the given directory.
+
+        Return a dict mapping subdir paths to their DirIds (in listing order),
+        and the set of file paths, or None if the directory cannot be listed.
+
+        File types and inode numbers come from the DirEntry objects returned by
+        os.scandir(), which on most platforms does not require any stat() calls.
+        A subdirectory lives on the same device as its parent, unless it is a
+        symlink, or the mount table says that it may be on another device (see
+        MountTable). Only these subdirectories need to be stat()ed to find their
+        DirId. Without a mount table, all subdirectories are stat()ed.
+        """
+        subdirs: Dict[Path, DirId] = {}
+        files: Set[Path] = set()
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    path = dir_path / entry.name
+                    try:
+                        if not entry.is_dir():
+                            files.add(path)
+                        elif (
+                            entry.is_symlink()
+                            or mounts is None
+                            or mounts.may_change_device(dir_id.dev, entry)
+                        ):
+                            dir_stat = entry.stat()  # follows symlinks
+                            subdirs[path] = DirId(dir_stat.st_dev, dir_stat.st_ino)
+                        else:
+                            subdirs[path] = DirId(dir_id.dev, entry.inode())
+                    except OSError:  # e.g. broken symlink, treat as a file
+                        files.add(path)
+        except OSError as exc:
+            logger.debug("  Cannot list %s: %s", dir_path, exc)
+            return None
+        return subdirs, files
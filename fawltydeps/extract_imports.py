@@ -3,12 +3,27 @@
 import ast
 import json
 import logging
+import os
 import tokenize
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import BinaryIO, Iterable, Iterator, Optional, Tuple, Union
+from typing import (
+    BinaryIO,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import isort
 
+from fawltydeps.cache import MODULE_SUFFIXES, ImportCache
+from fawltydeps.notebooks import open_notebook, read_notebook
 from fawltydeps.types import (
     CodeSource,
     Location,
@@ -16,7 +31,7 @@ from fawltydeps.types import (
     PathOrSpecial,
     UnparseablePathError,
 )
-from fawltydeps.utils import dirs_between
+from fawltydeps.utils import LazyStr, dirs_between
 
 logger = logging.getLogger(__name__)
 
@@ -34,14 +49,142 @@ def make_isort_config(path: Path, src_paths: Tuple[Path, ...] = ()) -> isort.Con
     )
 
 
-ISORT_FALLBACK_CONFIG = make_isort_config(Path())
+# Names of stdlib modules across all Python versions (as known by isort)
+STDLIB_MODULES = frozenset(isort.stdlibs.all.stdlib)
+
+# Directories in which first-party imports are resolved, in order of precedence
+FirstPartyContext = Tuple[Path, ...]
+
+
+class ImportClassifier:
+    """Classify imported module names as first- or third-party.
+
+    A module is first-party if it is part of the stdlib, or if it is found
+    in one of the directories of the given first-party context: either as a
+    subdirectory, a *.py file or an extension module, or if the context
+    directory itself has the same name as the module. This is the same logic
+    that isort uses for its src_paths.
+
+    Rather than asking isort for every name, we index the importable names in
+    each directory (once), and then look up names in these indices. The same
+    handful of names (e.g. "os") are imported over and over again across a
+    project, so we also remember the result for each (context, name) pair.
+
+    With use_isort=True, classification is instead delegated to isort. This is
+    slower, but useful for checking the parity of the two approaches.
+
+    A single instance is meant to be shared across all the files parsed in one
+    run. It should not be kept around for longer, as its results become stale
+    when first-party modules are added or removed.
+    """
+
+    def __init__(self, *, use_isort: bool = False) -> None:
+        self.use_isort = use_isort
+        self._contexts: Dict[Tuple[Optional[Path], Path], FirstPartyContext] = {}
+        self._isort_configs: Dict[FirstPartyContext, isort.Config] = {}
+        self._dir_indices: Dict[Path, FrozenSet[str]] = {}
+        self._external: Dict[Tuple[FirstPartyContext, str], bool] = {}
+
+    def local_context(
+        self, base_dir: Optional[Path], code_dir: Path
+    ) -> FirstPartyContext:
+        """Return the first-party context for code files found in 'code_dir'.
+
+        With a base_dir, first-party imports are resolved relative to base_dir
+        and all directories between it and 'code_dir'. Otherwise, they are
+        resolved relative to the current directory and 'code_dir'.
+        """
+        key = (base_dir, code_dir)
+        ret = self._contexts.get(key)
+        if ret is None:
+            if base_dir is None:
+                src_paths = [Path(), code_dir]
+            else:
+                src_paths = [base_dir, *dirs_between(base_dir, code_dir)]
+            ret = self._contexts[key] = tuple(p.absolute() for p in src_paths)
+        return ret
+
+    def _dir_index(self, path: Path) -> FrozenSet[str]:
+        """Return the names that are importable from the given directory."""
+        ret = self._dir_indices.get(path)
+        if ret is None:
+            names = set()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        is_dir = entry.is_dir()
+                        if is_dir:
+                            names.add(entry.name)
+                        if is_dir or entry.is_file():
+                            names.update(
+                                entry.name[: -len(suffix)]
+                                for suffix in MODULE_SUFFIXES
+                                if entry.name.endswith(suffix)
+                            )
+            except OSError:
+                pass
+            ret = self._dir_indices[path] = frozenset(names)
+        return ret
+
+    def _is_first_party(self, name: str, local_context: FirstPartyContext) -> bool:
+        return any(
+            name in self._dir_index(src_path)
+            or (src_path.name == name and src_path.is_dir())
+            for src_path in local_context
+        )
+
+    def _isort_placement(self, name: str, local_context: FirstPartyContext) -> str:
+        config = self._isort_configs.get(local_context)
+        if config is None:
+            config = make_isort_config(local_context[0], local_context[1:])
+            self._isort_configs[local_context] = config
+        return isort.place_module(name, config=config)
+
+    def is_external(self, name: str, local_context: FirstPartyContext) -> bool:
+        """Return True iff 'name' is a third-party import in the given context."""
+        key = (local_context, name)
+        ret = self._external.get(key)
+        if ret is None:
+            if self.use_isort:
+                ret = self._isort_placement(name, local_context) == "THIRDPARTY"
+            else:
+                ret = name not in STDLIB_MODULES and not self._is_first_party(
+                    name, local_context
+                )
+            self._external[key] = ret
+        return ret
+
+
+# Fields of AST nodes that hold nested statements (or intermediate nodes that
+# hold statements, e.g. except handlers and match cases), in the same relative
+# order as they appear in the nodes' _fields.
+STATEMENT_BLOCK_FIELDS = ("body", "handlers", "orelse", "finalbody", "cases")
+
+
+def iter_import_nodes(tree: ast.AST) -> Iterator[Union[ast.Import, ast.ImportFrom]]:
+    """Yield the import statements found in the given AST.
+
+    Import statements can only occur in statement positions, so we descend
+    only through statement blocks, and skip the (much more numerous)
+    expression nodes. Otherwise, this is a breadth-first traversal, yielding
+    the import statements in the same order as ast.walk().
+    """
+    todo = deque([tree])
+    while todo:
+        node = todo.popleft()
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node
+            continue
+        for field in STATEMENT_BLOCK_FIELDS:
+            todo.extend(getattr(node, field, ()))
 
 
 def parse_code(
     code: Union[str, bytes],
     *,
     source: Location,
-    local_context: isort.Config = ISORT_FALLBACK_CONFIG,
+    local_context: FirstPartyContext = (),
+    classifier: Optional[ImportClassifier] = None,
 ) -> Iterator[ParsedImport]:
     """Extract import statements from a (byte)string containing Python code.
 
@@ -54,19 +197,25 @@ def parse_code(
     the source correctly, e.g. by using the tokenize.open() helper or similar.
     For more details about Python source file encodings, please see
     https://docs.python.org/3/reference/lexical_analysis.html#encoding-declarations.
+
+    First-party imports are resolved relative to the directories in the given
+    local_context (by default, the current directory). Pass an ImportClassifier
+    to reuse first-/third-party classifications across multiple calls.
     """
+    is_external = (classifier or ImportClassifier()).is_external
+    local_context = local_context or (Path().absolute(),)
 
     def is_external_import(name: str) -> bool:
-        return isort.place_module(name, config=local_context) == "THIRDPARTY"
+        return is_external(name, local_context)
 
     try:
         parsed_code = ast.parse(code, filename=str(source.path))
     except SyntaxError as exc:
         logger.error(f"Could not parse code from {source}: {exc}")
         return
-    for node in ast.walk(parsed_code):
+    for node in iter_import_nodes(parsed_code):
         if isinstance(node, ast.Import):
-            logger.debug(ast.dump(node))
+            logger.debug("%s", LazyStr(ast.dump, node))
             for alias in node.names:
                 name = alias.name.split(".", 1)[0]
                 if is_external_import(name):
@@ -74,7 +223,7 @@ def parse_code(
                         name=name, source=source.supply(lineno=node.lineno)
                     )
         elif isinstance(node, ast.ImportFrom):
-            logger.debug(ast.dump(node))
+            logger.debug("%s", LazyStr(ast.dump, node))
             # Relative imports are always relative to the current package, and
             # will therefore not resolve to a third-party package.
             # They are therefore uninteresting to us.
@@ -87,15 +236,19 @@ def parse_code(
 
 
 def parse_notebook_file(  # noqa: C901
-    path: Path, local_context: Optional[isort.Config] = None
+    path: Path,
+    local_context: Optional[FirstPartyContext] = None,
+    classifier: Optional[ImportClassifier] = None,
 ) -> Iterator[ParsedImport]:
     """Extract import statements from an ipynb notebook.
 
     Generate (i.e. yield) the module names that are imported in the order
     they appear in the file.
     """
+    if classifier is None:
+        classifier = ImportClassifier()
     if not local_context:
-        local_context = make_isort_config(Path(), (path.parent,))
+        local_context = classifier.local_context(None, path.parent)
 
     def filter_out_magic_commands(
         lines: Iterable[str], source: Location
@@ -115,10 +268,10 @@ def parse_notebook_file(  # noqa: C901
             else:
                 yield line
 
-    with path.open("rb") as notebook:
+    with open_notebook(path) as notebook:
         try:
-            notebook_content = json.load(notebook, strict=False)
-        except json.decoder.JSONDecodeError as exc:
+            notebook_content = read_notebook(notebook)
+        except (json.decoder.JSONDecodeError, UnicodeDecodeError) as exc:
             logger.error(f"Could not parse code from {path}: {exc}")
             return
 
@@ -133,7 +286,10 @@ def parse_notebook_file(  # noqa: C901
                 if cell["cell_type"] == "code":
                     lines = filter_out_magic_commands(cell["source"], source=source)
                     yield from parse_code(
-                        "".join(lines), source=source, local_context=local_context
+                        "".join(lines),
+                        source=source,
+                        local_context=local_context,
+                        classifier=classifier,
                     )
             except KeyError as exc:
                 logger.error(f"Could not parse code from {source}: {exc}.")
@@ -151,23 +307,32 @@ def parse_notebook_file(  # noqa: C901
 
 
 def parse_python_file(
-    path: Path, local_context: Optional[isort.Config] = None
+    path: Path,
+    local_context: Optional[FirstPartyContext] = None,
+    classifier: Optional[ImportClassifier] = None,
 ) -> Iterator[ParsedImport]:
     """Extract import statements from a file containing Python code.
 
     Generate (i.e. yield) the module names that are imported in the order
     they appear in the file.
     """
+    if classifier is None:
+        classifier = ImportClassifier()
     if not local_context:
-        local_context = make_isort_config(Path(), (path.parent,))
+        local_context = classifier.local_context(None, path.parent)
     with tokenize.open(path) as pyfile:
         yield from parse_code(
-            pyfile.read(), source=Location(path), local_context=local_context
+            pyfile.read(),
+            source=Location(path),
+            local_context=local_context,
+            classifier=classifier,
         )
 
 
 def parse_source(
-    src: CodeSource, stdin: Optional[BinaryIO] = None
+    src: CodeSource,
+    stdin: Optional[BinaryIO] = None,
+    classifier: Optional[ImportClassifier] = None,
 ) -> Iterator[ParsedImport]:
     """Invoke a suitable parser for the given source.
 
@@ -183,34 +348,152 @@ def parse_source(
         # 'isatty' checks if the stream is interactive.
         if stdin.isatty():
             logger.warning("Reading code from terminal input. Ctrl+D to stop.")
-        return parse_code(stdin.read(), source=Location(src.path))
+        return parse_code(
+            stdin.read(), source=Location(src.path), classifier=classifier
+        )
 
     assert isinstance(src.path, Path)  # noqa: S101, sanity check / silence mypy
 
-    local_context = (
-        None
-        if src.base_dir is None
-        else make_isort_config(
-            path=src.base_dir,
-            src_paths=tuple(dirs_between(src.base_dir, src.path.parent)),
-        )
-    )
+    if classifier is None:
+        classifier = ImportClassifier()
+    local_context = classifier.local_context(src.base_dir, src.path.parent)
 
     if src.path.suffix == ".py":
         logger.info("Parsing Python file %s", src.path)
-        return parse_python_file(src.path, local_context)
+        return parse_python_file(src.path, local_context, classifier)
     if src.path.suffix == ".ipynb":
         logger.info("Parsing Notebook file %s", src.path)
-        return parse_notebook_file(src.path, local_context)
+        return parse_notebook_file(src.path, local_context, classifier)
     raise RuntimeError("MISMATCH BETWEEN CODE PATH AND CODE PARSERS!")
 
 
+# When parsing in parallel, aim for this many chunks of work per worker process,
+# to even out the load when some chunks turn out to be slower than others.
+CHUNKS_PER_JOB = 4
+
+
+def _init_worker(log_level: int) -> None:
+    """Set up logging in a worker process started by parse_sources()."""
+    logging.basicConfig(level=log_level)
+
+
+def _parse_chunk(
+    chunk: List[CodeSource], *, use_isort: bool
+) -> List[List[ParsedImport]]:
+    """Parse a chunk of (non-stdin) sources in a worker process."""
+    classifier = ImportClassifier(use_isort=use_isort)
+    return [list(parse_source(src, classifier=classifier)) for src in chunk]
+
+
+def _chunk_sources(
+    sources: List[CodeSource], jobs: int
+) -> Iterator[Union[CodeSource, List[CodeSource]]]:
+    """Split the given sources into chunks of roughly equal size (in bytes).
+
+    Chunks consist of consecutive sources, so that concatenating the chunks
+    reproduces the original order. The "<stdin>" source is never part of a
+    chunk, but yielded by itself (it must be parsed in the main process).
+    """
+    sizes = [
+        src.path.stat().st_size if isinstance(src.path, Path) else 0 for src in sources
+    ]
+    max_chunk_size = max(1, sum(sizes) // (jobs * CHUNKS_PER_JOB))
+    chunk: List[CodeSource] = []
+    chunk_size = 0
+    for src, size in zip(sources, sizes):
+        is_stdin = not isinstance(src.path, Path)
+        if chunk and (is_stdin or chunk_size >= max_chunk_size):
+            yield chunk
+            chunk, chunk_size = [], 0
+        if is_stdin:
+            yield src
+        else:
+            chunk.append(src)
+            chunk_size += size
+    if chunk:
+        yield chunk
+
+
+def _parse_each(
+    sources: List[CodeSource],
+    stdin: Optional[BinaryIO],
+    jobs: int,
+    *,
+    use_isort: bool,
+) -> Iterator[List[ParsedImport]]:
+    """Parse the given sources, and yield a list of imports for each source.
+
+    With jobs > 1, the sources are split into chunks that are parsed by a pool
+    of 'jobs' worker processes. The results are still yielded in the same order
+    as the given sources.
+    """
+    classifier = ImportClassifier(use_isort=use_isort)
+    if jobs <= 1 or len(sources) <= 1:
+        for source in sources:
+            yield list(parse_source(source, stdin, classifier))
+        return
+
+    work = list(_chunk_sources(sources, jobs))
+    num_chunks = sum(1 for item in work if isinstance(item, list))
+    logger.debug(f"Parsing {num_chunks} chunks of code with {jobs} processes")
+    with ProcessPoolExecutor(
+        max_workers=max(1, min(jobs, num_chunks)),
+        initializer=_init_worker,
+        initargs=(logging.getLogger().getEffectiveLevel(),),
+    ) as executor:
+        # Submit all chunks up front, then collect results in submission order
+        pending: List[Union[CodeSource, Future[List[List[ParsedImport]]]]] = [
+            executor.submit(_parse_chunk, item, use_isort=use_isort)
+            if isinstance(item, list)
+            else item
+            for item in work
+        ]
+        for item in pending:
+            if isinstance(item, CodeSource):  # <stdin> is parsed right here
+                yield list(parse_source(item, stdin, classifier))
+            else:
+                yield from item.result()
+
+
 def parse_sources(
-    sources: Iterable[CodeSource], stdin: Optional[BinaryIO] = None
+    sources: Iterable[CodeSource],
+    stdin: Optional[BinaryIO] = None,
+    jobs: int = 1,
+    cache: Optional[ImportCache] = None,
+    *,
+    use_isort: bool = False,
 ) -> Iterator[ParsedImport]:
-    """Parse import statements from the given sources."""
-    for source in sources:
-        yield from parse_source(source, stdin)
+    """Parse import statements from the given sources.
+
+    With jobs > 1, parse the sources in parallel using a pool of 'jobs' worker
+    processes. The imports are yielded in the same order in either case.
+
+    If an ImportCache is given, only parse the sources that are not found in
+    the cache, and add the newly parsed imports to the cache. It is up to the
+    caller to .save() the cache afterwards.
+
+    With use_isort=True, delegate the classification of first-/third-party
+    imports to isort (see ImportClassifier).
+    """
+    sources = list(sources)
+    cached: Dict[CodeSource, List[ParsedImport]] = {}
+    if cache is not None:
+        for src in sources:
+            if isinstance(src.path, Path):
+                imports = cache.lookup(src)
+                if imports is not None:
+                    cached[src] = imports
+    misses = [src for src in sources if src not in cached]
+    parsed = zip(misses, _parse_each(misses, stdin, jobs, use_isort=use_isort))
+
+    for src in sources:
+        if src in cached:
+            yield from cached[src]
+        else:
+            _src, imports = next(parsed)
+            if cache is not None and isinstance(src.path, Path):
+                cache.store(src, imports)
+            yield from imports
 
 
 def validate_code_source(
@@ -0,0 +1,115 @@
+"""List the files in a git work tree from the git index, instead of walking it.
+
+In a git checkout, git already keeps track of which files belong to the
+project: tracked files are recorded in the index (.git/index), and untracked
+files that are not ignored can be found by git much faster than we can (git
+only rescans directories that have changed since the last time it looked,
+when its untracked cache is enabled). Asking git for these paths allows us to
+skip traversing the directory structure ourselves, as well as skip matching
+every path against the .gitignore patterns.
+"""
+
+import logging
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Mode bits recorded in the git index for entries that are not regular files
+GITLINK_MODE = "160000"  # submodule
+SYMLINK_MODE = "120000"
+
+
+def git_ls_files(work_dir: Path, *args: str) -> List[str]:
+    """Run `git ls-files` with the given arguments inside the given directory.
+
+    Return the paths listed by git (relative to 'work_dir'). Raise OSError if
+    git cannot be run, or subprocess.CalledProcessError if git fails (e.g.
+    because 'work_dir' is not inside a git work tree).
+    """
+    git_runner = partial(
+        subprocess.run,
+        cwd=work_dir,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        # Decode paths like os.fsdecode() does
+        encoding=sys.getfilesystemencoding(),
+        errors="surrogateescape",
+        check=True,
+    )
+    proc = git_runner(["git", "ls-files", "-z", *args])
+    return [entry for entry in proc.stdout.split("\0") if entry]
+
+
+@dataclass
+class GitListing:
+    """The paths below a directory in a git work tree, as seen by git.
+
+    All paths are prefixed with the directory that was listed, i.e. they are
+    relative or absolute in the same way as that directory.
+    """
+
+    dir_path: Path  # the directory that was listed
+    files: Set[Path] = field(default_factory=set)  # tracked or untracked files
+    ignored_dirs: Set[Path] = field(default_factory=set)  # ignored by git
+    # Directories that git cannot tell us the contents of: submodules, nested
+    # git repos, and symlinks to directories. These must be traversed instead.
+    subtrees: Set[Path] = field(default_factory=set)
+
+    @classmethod
+    def from_dir(cls, dir_path: Path) -> Optional["GitListing"]:
+        """List the paths below the given directory.
+
+        Return None if the given directory is not inside a git work tree, or
+        if git is not available.
+        """
+        try:
+            staged = git_ls_files(dir_path, "--stage")
+            untracked = git_ls_files(dir_path, "--others", "--exclude-standard")
+            ignored = git_ls_files(
+                dir_path, "--others", "--ignored", "--exclude-standard", "--directory"
+            )
+        except (OSError, subprocess.CalledProcessError) as exc:
+            stderr = getattr(exc, "stderr", None)
+            logger.debug(f"Cannot list {dir_path} with git: {stderr or exc!r}")
+            return None
+
+        ret = cls(dir_path)
+        for entry in staged:
+            # Each entry is "<mode> <object> <stage>\t<path>"
+            info, name = entry.split("\t", 1)
+            mode = info.split(" ", 1)[0]
+            path = dir_path / name
+            if mode == GITLINK_MODE or (mode == SYMLINK_MODE and path.is_dir()):
+                ret.subtrees.add(path)
+            else:
+                ret.files.add(path)
+        for name in untracked:
+            if name.endswith("/"):  # nested git repo
+                ret.subtrees.add(dir_path / name)
+            else:
+                ret.files.add(dir_path / name)
+        ret.ignored_dirs = {dir_path / name for name in ignored if name.endswith("/")}
+        logger.debug(
+            f"Found {len(ret.files)} files, {len(ret.subtrees)} subtrees and"
+            f" {len(ret.ignored_dirs)} ignored dirs under {dir_path} via git"
+        )
+        return ret
+
+    def parent_dirs(self) -> Set[Path]:
+        """Return the directories that contain any of our paths.
+
+        This includes the listed directory itself, but not the directories in
+        .ignored_dirs or .subtrees (unless they are nested within each other).
+        """
+        ret = {self.dir_path}
+        for path in [*self.files, *self.subtrees, *self.ignored_dirs]:
+            for parent in path.parents:
+                if parent in ret:
+                    break
+                ret.add(parent)
+        return ret
@@ -87,7 +87,11 @@ def parse_gitignore_lines(
 
 
 def match_rules(rules: List[Rule], path: Path, *, is_dir: bool) -> bool:
-    """Match the given path against the given list of rules."""
+    """Match the given path against the given list of rules.
+
+    This tries each rule in turn. To match many paths against the same rules,
+    use a RuleSet (see below) instead.
+    """
     for rule in reversed(rules):
         if rule.match(path, is_dir=is_dir):
             return not rule.negated
@@ -274,3 +278,175 @@ def fnmatch_pathname_to_regex(pattern: str, *, anchored: bool = False) -> Compil
     result.append("$")
 
     return re.compile("".join(result))
+
+
+# The regexes built by fnmatch_pathname_to_regex() have one of these prefixes:
+ANCHORED_PREFIX = "^"
+UNANCHORED_PREFIX = f"(^|{SEPS_GROUP})"
+SEP_CHARS = tuple(sep for sep in [os.sep, os.altsep] if sep is not None)
+
+
+def _literal_from_rule(rule: Rule) -> Optional[Tuple[str, str]]:
+    """Return the kind of literal matched by this rule, and the literal itself.
+
+    The kind is one of:
+    - "path": An anchored rule with a literal pattern, e.g. "/build", which
+      matches only when the (relative) path equals the literal.
+    - "name": An unanchored rule with a literal pattern, e.g. "build", which
+      matches when the last path component equals the literal.
+    - "suffix": An unanchored rule with a literal pattern after a single
+      leading '*', e.g. "*.pyc", which matches when the last path component
+      ends with the literal.
+
+    Return None for all other rules, which must be matched by their regex.
+    """
+    regex = rule.regex.pattern
+    if regex.startswith(UNANCHORED_PREFIX):
+        kind, body = "name", regex[len(UNANCHORED_PREFIX) : -1]
+        if body.startswith(f"{NONSEP}*"):
+            kind, body = "suffix", body[len(NONSEP) + 1 :]
+    else:
+        assert regex.startswith(ANCHORED_PREFIX)  # noqa: S101, sanity check
+        kind, body = "path", regex[len(ANCHORED_PREFIX) : -1]
+    literal = re.sub(r"\\(.)", r"\1", body, flags=re.DOTALL)
+    if re.escape(literal) != body:  # not a literal
+        return None
+    return kind, literal
+
+
+class _CompiledRules:
+    """Match a relative path against a number of rules.
+
+    Rules with literal patterns are served from hash tables, and all other
+    rules are merged into a single regex. Rules are identified by their index
+    into the containing RuleSet, and .match() returns the highest index of a
+    matching rule (or -1), to implement last-match-wins semantics.
+    """
+
+    def __init__(self, indexed_rules: List[Tuple[int, Rule]]):
+        self.tables: Dict[str, Dict[str, int]] = {"path": {}, "name": {}, "suffix": {}}
+        regex_rules: List[Tuple[int, Rule]] = []
+        for index, rule in indexed_rules:  # in increasing order of index
+            literal = _literal_from_rule(rule)
+            if literal is None:
+                regex_rules.append((index, rule))
+            else:
+                kind, text = literal
+                self.tables[kind][text] = index
+        self.suffix_lengths = sorted({len(suffix) for suffix in self.tables["suffix"]})
+        self.regex = self._combine(regex_rules)
+
+    @staticmethod
+    def _combine(indexed_rules: List[Tuple[int, Rule]]) -> Optional[CompiledRegex]:
+        """Merge the regexes of the given rules into a single regex.
+
+        Each rule's regex is converted to the equivalent regex for fullmatch(),
+        and wrapped in a named group that identifies the rule. Alternatives are
+        tried in order, so putting the last rule first makes the regex report
+        the last matching rule.
+        """
+        if not indexed_rules:
+            return None
+        alternatives = []
+        for index, rule in reversed(indexed_rules):
+            regex = rule.regex.pattern
+            if regex.startswith(UNANCHORED_PREFIX):
+                body = f"(?:(?s:.*){SEPS_GROUP})?{regex[len(UNANCHORED_PREFIX) : -1]}"
+            else:
+                body = regex[len(ANCHORED_PREFIX) : -1]
+            alternatives.append(f"(?P<r{index}>{body})")
+        return re.compile("|".join(alternatives))
+
+    def match(self, rel_path: str) -> int:
+        """Return the index of the last rule matching the given relative path."""
+        best = self.tables["path"].get(rel_path, -1)
+        name = rel_path[max(rel_path.rfind(sep) for sep in SEP_CHARS) + 1 :]
+        best = max(best, self.tables["name"].get(name, -1))
+        suffixes = self.tables["suffix"]
+        for length in self.suffix_lengths:
+            if length > len(name):
+                break
+            best = max(best, suffixes.get(name[len(name) - length :], -1))
+        if self.regex is not None:
+            match = self.regex.fullmatch(rel_path)
+            if match is not None:
+                assert match.lastgroup is not None  # noqa: S101, sanity check
+                best = max(best, int(match.lastgroup[1:]))
+        return best
+
+
+class _RuleGroupMatcher:
+    """Match relative paths against a group of rules sharing the same base_dir.
+
+    Rule.match() appends a slash to directory paths for negated rules, so when
+    matching directories, the negated rules are compiled separately, to be
+    matched against the path with the slash appended. When matching files,
+    dir-only rules are skipped, as they never match.
+    """
+
+    def __init__(self, indexed_rules: List[Tuple[int, Rule]], *, is_dir: bool):
+        self.rules = _CompiledRules(
+            [
+                (index, rule)
+                for index, rule in indexed_rules
+                if not (rule.negated and is_dir) and (is_dir or not rule.dir_only)
+            ]
+        )
+        self.slash_rules = _CompiledRules(
+            [(index, rule) for index, rule in indexed_rules if rule.negated and is_dir]
+        )
+
+    def match(self, rel_path: str, slash_path: str) -> int:
+        """Return the index of the last rule matching the given relative path.
+
+        The 'slash_path' is the same relative path, as seen by negated rules.
+        """
+        return max(self.rules.match(rel_path), self.slash_rules.match(slash_path))
+
+
+class RuleSet:
+    """A compiled set of ignore rules, for matching many paths efficiently.
+
+    This gives the same results as match_rules(), but instead of trying each
+    rule in turn (with its own relative_to() and regex search), the rules are
+    grouped by base_dir, so that each path is made relative only once per
+    group. Within each group, literal names (e.g. "build") and extensions (e.g.
+    "*.pyc") are looked up in hash tables, and the remaining rules are merged
+    into a single regex. Negated rules and last-match-wins are handled by
+    finding the last matching rule across all of these.
+    """
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules = list(rules)
+        groups: Dict[Optional[Path], List[Tuple[int, Rule]]] = {}
+        for index, rule in enumerate(self.rules):
+            groups.setdefault(rule.base_dir or None, []).append((index, rule))
+        self.groups = [
+            (
+                base_dir,
+                _RuleGroupMatcher(indexed_rules, is_dir=False),
+                _RuleGroupMatcher(indexed_rules, is_dir=True),
+            )
+            for base_dir, indexed_rules in groups.items()
+        ]
+
+    def match(self, path: Path, *, is_dir: bool) -> bool:
+        """Return True iff the given path should be ignored."""
+        best = -1
+        for base_dir, file_matcher, dir_matcher in self.groups:
+            if base_dir is None:
+                rel_path = str(path)
+            else:
+                try:
+                    rel_path = path.relative_to(base_dir).as_posix()
+                except ValueError:  # path not relative to base_dir
+                    continue
+            # Strip leading "./" after adding the slash, like Rule.match() does
+            slash_path = rel_path + "/" if is_dir else rel_path
+            if rel_path.startswith("./"):
+                rel_path = rel_path[2:]
+            if slash_path.startswith("./"):
+                slash_path = slash_path[2:]
+            matcher = dir_matcher if is_dir else file_matcher
+            best = max(best, matcher.match(rel_path, slash_path))
+        return best >= 0 and not self.rules[best].negated
@@ -6,6 +6,7 @@ import sys
 from typing import Dict, List, Union
 
 from fawltydeps.types import Location
+from fawltydeps.utils import LazyStr
 
 logger = logging.getLogger(__name__)
 
@@ -55,7 +56,7 @@ class VariableTracker:
         the entire setup.py.
         """
         if isinstance(node, ast.Assign):
-            logger.debug(f"Got {self._dump(node)}")
+            logger.debug("Got %s", LazyStr(self._dump, node))
             for target in node.targets:
                 if isinstance(target, ast.Name) and isinstance(target.ctx, ast.Store):
                     try:
@@ -79,7 +80,7 @@ class VariableTracker:
             - Anything that is not a literal or a variable reference, e.g. the
               result of a function call.
         """
-        logger.debug(f"Resolving {self._dump(node)}")
+        logger.debug("Resolving %s", LazyStr(self._dump, node))
         # Python v3.8 changed from ast.Str to ast.Constant
         if isinstance(node, (ast.Constant, ast.Str)):
             return str(ast.literal_eval(node))
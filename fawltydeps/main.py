@@ -25,12 +25,14 @@ except ModuleNotFoundError:
     from pydantic.json import custom_pydantic_encoder  # type: ignore[no-redef]
 
 from fawltydeps import extract_declared_dependencies, extract_imports
+from fawltydeps.cache import ImportCache
 from fawltydeps.check import calculate_undeclared, calculate_unused
 from fawltydeps.cli_parser import build_parser
 from fawltydeps.gitignore_parser import RuleError as ExcludeRuleError
 from fawltydeps.packages import (
     BasePackageResolver,
     Package,
+    import_providers,
     resolve_dependencies,
     setup_resolvers,
 )
@@ -40,6 +42,7 @@ from fawltydeps.types import (
     CodeSource,
     DeclaredDependency,
     DepsSource,
+    Location,
     ParsedImport,
     PyEnvSource,
     Source,
@@ -74,6 +77,8 @@ class Analysis:
     - .resolved_deps contains the mapping from .declared_deps to the Python
         package that expose the corresponding imports. This package is found
         within one of the PyEnvSources.
+    - .import_providers maps each import name provided by the .resolved_deps
+        back to the names of the dependencies that provide it.
     - .undeclared_deps is calculated by finding the .imports that are not
         present in any of the .resolved_deps.
     - .unused_deps is the subset of .declared_deps whose corresponding packages
@@ -92,6 +97,7 @@ class Analysis:
         self._imports: Optional[List[ParsedImport]] = None
         self._declared_deps: Optional[List[DeclaredDependency]] = None
         self._resolved_deps: Optional[Dict[str, Package]] = None
+        self._import_providers: Optional[Dict[str, Set[str]]] = None
         self._undeclared_deps: Optional[List[UndeclaredDependency]] = None
         self._unused_deps: Optional[List[UnusedDependency]] = None
 
@@ -122,12 +128,27 @@ class Analysis:
     @calculated_once
     def imports(self) -> List[ParsedImport]:
         """The list of 3rd-party imports parsed from this project."""
-        return list(
+        cache = (
+            None
+            if self.settings.cache_dir is None
+            else ImportCache.for_code_paths(
+                self.settings.cache_dir,
+                self.settings.code,
+                use_isort=self.settings.use_isort,
+            )
+        )
+        imports = list(
             extract_imports.parse_sources(
                 (src for src in self.sources if isinstance(src, CodeSource)),
                 self.stdin,
+                jobs=self.settings.jobs,
+                cache=cache,
+                use_isort=self.settings.use_isort,
             )
         )
+        if cache is not None:
+            cache.save()
+        return imports
 
     @property
     @calculated_once
@@ -152,9 +173,20 @@ class Analysis:
                 pyenv_srcs=pyenv_srcs,
                 use_current_env=True,
                 install_deps=self.settings.install_deps,
+                cache_dir=self.settings.cache_dir,
+                jobs=self.settings.jobs,
+                max_install_cache_size=self.settings.max_install_cache_size * 2**20,
+                failed_install_ttl=self.settings.failed_install_ttl * 60 * 60,
+                wheelhouse=self.settings.wheelhouse,
             ),
         )
 
+    @property
+    @calculated_once
+    def import_providers(self) -> Dict[str, Set[str]]:
+        """The mapping from provided import names to resolved dependencies."""
+        return import_providers(self.resolved_deps)
+
     @property
     @calculated_once
     def undeclared_deps(self) -> List[UndeclaredDependency]:
@@ -166,7 +198,11 @@ class Analysis:
     def unused_deps(self) -> List[UnusedDependency]:
         """The declared dependencies that appear to not be in use."""
         return calculate_unused(
-            self.imports, self.declared_deps, self.resolved_deps, self.settings
+            self.imports,
+            self.declared_deps,
+            self.resolved_deps,
+            self.settings,
+            self.import_providers,
         )
 
     @classmethod
@@ -209,6 +245,7 @@ class Analysis:
             set: partial(sorted, key=str),
             type(BasePackageResolver): lambda klass: klass.__name__,
             type(Source): lambda klass: klass.__name__,
+            Location: Location.to_dict,
         }
         encoder = partial(custom_pydantic_encoder, custom_type_encoders)
         json_dict = {
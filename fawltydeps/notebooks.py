@@ -0,0 +1,258 @@
+"""Incrementally read the parts of Jupyter notebooks that we care about.
+
+Notebooks (.ipynb files) are JSON documents, but apart from the source code
+cells they often contain large amounts of data that we are not interested in,
+e.g. base64-encoded images in cell outputs, or widget state in metadata.
+Loading all of this with json.load() is slow and uses a lot of memory.
+
+Instead, read_notebook() reads the notebook in chunks, and only decodes the
+parts we need. Everything else is skipped over without building any Python
+objects for it.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Pattern, TextIO
+
+# The keys of each cell that we want to decode. All other keys are skipped.
+CELL_KEYS = ("cell_type", "source")
+
+# Matches the next character that affects nesting when skipping over a value.
+STRUCTURE = re.compile(r'["\[\]{}]')
+# Matches the remainder of a scalar value (number, true, false, null).
+SCALAR = re.compile(r"[^,:\[\]{}\s]*")
+WHITESPACE = re.compile(r"\s*")
+
+
+def match_end(pattern: Pattern[str], text: str, pos: int) -> int:
+    """Match the given pattern at 'pos' in 'text', and return where it ends.
+
+    The pattern must be able to match the empty string, so it always matches.
+    """
+    match = pattern.match(text, pos)
+    assert match is not None  # noqa: S101, sanity check
+    return match.end()
+
+
+JsonValue = Any  # type: ignore[misc]
+ValueReader = Callable[["NotebookReader"], JsonValue]
+
+
+class NotebookReader:
+    """A minimal incremental JSON reader that can skip over unwanted values.
+
+    Only as much of the input as needed is kept in memory, except when
+    decoding a value (with .read_value()), which must fit in memory anyway.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, file: TextIO):
+        self.file = file
+        self.buf = ""
+        self.pos = 0  # current position in .buf
+        self.offset = 0  # position of .buf[0] in the input
+        self.mark: Optional[int] = None  # keep .buf from here, when set
+        self.eof = False
+
+    def error(self, msg: str) -> json.JSONDecodeError:
+        """Return an error at the current position of the input."""
+        # We don't keep the full document around, so the reported line and
+        # column numbers are those of the current position within the buffer.
+        return json.JSONDecodeError(
+            f"{msg} (at offset {self.offset + self.pos})", self.buf, self.pos
+        )
+
+    def fill(self) -> bool:
+        """Read more input, discarding consumed input. Return False at EOF."""
+        if self.eof:
+            return False
+        keep = self.pos if self.mark is None else self.mark
+        chunk = self.file.read(self.CHUNK_SIZE)
+        self.buf = self.buf[keep:] + chunk
+        self.offset += keep
+        self.pos -= keep
+        if self.mark is not None:
+            self.mark -= keep
+        self.eof = not chunk
+        return not self.eof
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ("" at EOF)."""
+        while True:
+            self.pos = match_end(WHITESPACE, self.buf, self.pos)
+            if self.pos < len(self.buf) or not self.fill():
+                return self.buf[self.pos : self.pos + 1]
+
+    def expect(self, char: str) -> None:
+        """Consume the given character, or fail."""
+        if self.peek() != char:
+            raise self.error(f"Expecting {char!r}")
+        self.pos += 1
+
+    def _backslashes_before(self, end: int) -> int:
+        """Count the consecutive backslashes between .pos and 'end'."""
+        start = end
+        while start > self.pos and self.buf[start - 1] == "\\":
+            start -= 1
+        return end - start
+
+    def _skip_string_rest(self) -> None:
+        """Skip the rest of a string, including the closing quote."""
+        while True:
+            end = self.buf.find('"', self.pos)
+            if end < 0:
+                # Keep trailing backslashes, as they may escape the next char
+                end = len(self.buf)
+                self.pos = end - self._backslashes_before(end)
+                if not self.fill():
+                    raise self.error("Unterminated string")
+                continue
+            escaped = self._backslashes_before(end) % 2 == 1
+            self.pos = end + 1
+            if not escaped:
+                return
+
+    def _skip_scalar(self) -> None:
+        """Skip a number, true, false or null."""
+        while True:
+            self.pos = match_end(SCALAR, self.buf, self.pos)
+            if self.pos < len(self.buf) or not self.fill():
+                return
+
+    def skip_value(self) -> None:
+        """Skip over the next value, without decoding it."""
+        first = self.peek()
+        if first == '"':
+            self.pos += 1
+            self._skip_string_rest()
+            return
+        if first not in "[{":
+            self._skip_scalar()
+            return
+        depth = 0
+        while True:
+            match = STRUCTURE.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                if not self.fill():
+                    raise self.error("Unterminated value")
+                continue
+            self.pos = match.end()
+            char = match.group()
+            if char == '"':
+                self._skip_string_rest()
+            elif char in "[{":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def read_value(self) -> JsonValue:
+        """Decode and return the next value."""
+        self.peek()
+        self.mark = self.pos
+        try:
+            self.skip_value()
+            start = self.mark
+        finally:
+            self.mark = None
+        try:
+            return json.loads(self.buf[start : self.pos], strict=False)
+        except json.JSONDecodeError as exc:
+            raise self.error(exc.msg) from exc
+
+    def read_object(
+        self, keys: Optional[Dict[str, Optional[ValueReader]]] = None
+    ) -> Dict[str, JsonValue]:
+        """Read an object, decoding only the values of the given keys.
+
+        'keys' maps each wanted key to a function that reads its value (given
+        this reader), or to None to read the value with .read_value().
+        Values of other keys are skipped.
+        """
+        keys = keys or {}
+        ret: Dict[str, JsonValue] = {}
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return ret
+        while True:
+            if self.peek() != '"':
+                raise self.error("Expecting property name enclosed in double quotes")
+            key = self.read_value()
+            self.expect(":")
+            if key in keys:
+                reader = keys[key]
+                ret[key] = self.read_value() if reader is None else reader(self)
+            else:
+                self.skip_value()
+            if self.peek() == "}":
+                self.pos += 1
+                return ret
+            self.expect(",")
+
+    def read_array(self, read_item: ValueReader) -> List[JsonValue]:
+        """Read an array, reading each item with the given function."""
+        ret: List[JsonValue] = []
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return ret
+        while True:
+            ret.append(read_item(self))
+            if self.peek() == "]":
+                self.pos += 1
+                return ret
+            self.expect(",")
+
+
+def _read_cell(reader: NotebookReader) -> JsonValue:
+    if reader.peek() != "{":
+        return reader.read_value()
+    return reader.read_object(dict.fromkeys(CELL_KEYS))
+
+
+def _read_cells(reader: NotebookReader) -> JsonValue:
+    if reader.peek() != "[":
+        return reader.read_value()
+    return reader.read_array(_read_cell)
+
+
+def _read_metadata(reader: NotebookReader) -> JsonValue:
+    if reader.peek() != "{":
+        return reader.read_value()
+    return reader.read_object({"language_info": None})
+
+
+def open_notebook(path: Path) -> TextIO:
+    """Open the given notebook file as text, for passing to read_notebook().
+
+    JSON documents may be encoded in UTF-8, UTF-16 or UTF-32 (with or without
+    a BOM). Detect the encoding from the first bytes, like json.load() does.
+    """
+    with path.open("rb") as file:
+        head = file.read(4)
+    return path.open(encoding=json.detect_encoding(head))
+
+
+def read_notebook(file: TextIO) -> Dict[str, JsonValue]:
+    """Read the language and code cells from the given notebook file.
+
+    Return a dict with the same structure as json.load() would return, but
+    with only these parts filled in:
+      - notebook["metadata"]["language_info"]
+      - notebook["cells"][*]["cell_type"]
+      - notebook["cells"][*]["source"]
+
+    Raise json.JSONDecodeError if the notebook is not valid JSON. Note that
+    the parts that are skipped are only checked for balanced brackets, and are
+    not otherwise validated.
+    """
+    reader = NotebookReader(file)
+    ret = reader.read_object({"metadata": _read_metadata, "cells": _read_cells})
+    if reader.peek():
+        raise reader.error("Extra data")
+    return ret
@@ -1,17 +1,25 @@
 """Encapsulate the lookup of packages and their provided import names."""
 
+import csv
+import inspect
+import io
 import logging
+import os
+import re
 import subprocess
 import sys
 import tempfile
 import venv
+import zipfile
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager, suppress
 from dataclasses import dataclass, replace
 from functools import partial
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from typing import (
     AbstractSet,
+    Callable,
     Dict,
     Iterable,
     Iterator,
@@ -29,12 +37,22 @@ from typing import (
 # (or even later). For now, it is safer for us to _pin_ the 3rd-party dependency
 # and use that across all of our supported Python versions.
 from importlib_metadata import (
+    Distribution,
     DistributionFinder,
     MetadataPathFinder,
+    PathDistribution,
     _top_level_declared,
     _top_level_inferred,
 )
 
+from fawltydeps.cache import (
+    FAILED_INSTALL_TTL,
+    CompiledMapping,
+    DistDetails,
+    InstalledRequirementsCache,
+    PackageDirIndex,
+    is_dist_info,
+)
 from fawltydeps.types import (
     CustomMapping,
     PyEnvSource,
@@ -50,6 +68,9 @@ else:
 
 PackageDebugInfo = Union[None, str, Dict[str, Set[str]]]
 
+# Default size cap (in bytes) for packages cached by TemporaryPipInstallResolver
+DEFAULT_MAX_INSTALL_CACHE_SIZE = 1024 * 2**20
+
 logger = logging.getLogger(__name__)
 
 
@@ -92,12 +113,6 @@ class Package:
         ]
         return set(provides_stubs_for)
 
-    def is_used(self, imported_names: Iterable[str]) -> bool:
-        """Return True iff this package is among the given import names."""
-        return bool(self.import_names.intersection(imported_names)) or bool(
-            self.has_type_stubs().intersection(imported_names)
-        )
-
 
 class BasePackageResolver(ABC):
     """Define the interface for doing package -> import names lookup."""
@@ -125,29 +140,30 @@ def accumulate_mappings(
     Each resulting package object maps a (normalized) package name to a mapping
     dict where the provided imports are keyed by their associated description.
     The keys in the returned dict are also normalized package names.
+
+    The import names and debug info of each package are accumulated in place,
+    and Package objects are only created once all mappings have been merged.
     """
-    result: Dict[str, Package] = {}
+    import_names: Dict[str, Set[str]] = {}
+    debug_info: Dict[str, Dict[str, Set[str]]] = {}
     for custom_mapping, debug_key in custom_mappings:
         for name, imports in custom_mapping.items():
             normalized_name = Package.normalize_name(name)
-            if normalized_name not in result:  # create new Package instance
-                result[normalized_name] = Package(
-                    package_name=normalized_name,
-                    import_names=set(imports),
-                    resolved_with=resolved_with,
-                    debug_info={debug_key: set(imports)},
-                )
-            else:  # replace existing Package instance with "augmented" version
-                prev = result[normalized_name]
-                debug_info = prev.debug_info
-                assert isinstance(debug_info, dict)  # noqa: S101, sanity check
-                debug_info.setdefault(debug_key, set()).update(imports)
-                result[normalized_name] = replace(
-                    prev,
-                    import_names=set.union(prev.import_names, imports),
-                    debug_info=debug_info,
-                )
-    return result
+            if normalized_name not in import_names:
+                import_names[normalized_name] = set(imports)
+                debug_info[normalized_name] = {debug_key: set(imports)}
+            else:
+                import_names[normalized_name].update(imports)
+                debug_info[normalized_name].setdefault(debug_key, set()).update(imports)
+    return {
+        name: Package(
+            package_name=name,
+            import_names=imports,
+            resolved_with=resolved_with,
+            debug_info=debug_info[name],
+        )
+        for name, imports in import_names.items()
+    }
 
 
 class UserDefinedMapping(BasePackageResolver):
@@ -157,7 +173,14 @@ class UserDefinedMapping(BasePackageResolver):
         self,
         mapping_paths: Optional[Set[Path]] = None,
         custom_mapping: Optional[CustomMapping] = None,
+        cache_dir: Optional[Path] = None,
     ) -> None:
+        """Use the given custom mapping and/or mapping files.
+
+        If a cache_dir is given, each mapping file is compiled into an indexed
+        database there (see CompiledMapping), which is then used to look up
+        only the requested packages.
+        """
         self.mapping_paths = mapping_paths or set()
         for path in self.mapping_paths:
             if not path.is_file():
@@ -165,9 +188,40 @@ class UserDefinedMapping(BasePackageResolver):
                     ctx="Given mapping path is not a file.", path=path
                 )
         self.custom_mapping = custom_mapping
+        self.cache_dir = cache_dir
         # We enumerate packages declared in the mapping _once_ and cache the result here:
         self._packages: Optional[Dict[str, Package]] = None
 
+    @staticmethod
+    def _load_mapping_file(path: Path) -> CustomMapping:
+        """Parse a TOML-formatted CustomMapping from the given file."""
+        logger.debug(f"Loading user-defined mapping from {path}")
+        with path.open("rb") as mapping_file:
+            return tomllib.load(mapping_file)
+
+    def _custom_mappings(
+        self, only: Optional[AbstractSet[str]] = None
+    ) -> Iterator[Tuple[CustomMapping, str]]:
+        """Yield the custom mappings from our settings and mapping files.
+
+        If 'only' is given (and we have a cache_dir), look up only these
+        (normalized) package names in compiled mapping files, rather than
+        parsing the mapping files.
+        """
+        if self.custom_mapping is not None:
+            logger.debug("Applying user-defined mapping from settings.")
+            yield self.custom_mapping, "from settings"
+
+        for path in self.mapping_paths:
+            if only is None or self.cache_dir is None:
+                yield self._load_mapping_file(path), str(path)
+            else:
+                compiled = CompiledMapping.for_mapping_file(self.cache_dir, path)
+                mapping = compiled.lookup(
+                    only, self._load_mapping_file, Package.normalize_name
+                )
+                yield mapping, str(path)
+
     @property
     @calculated_once
     def packages(self) -> Dict[str, Package]:
@@ -182,43 +236,285 @@ class UserDefinedMapping(BasePackageResolver):
         This enumerates the available packages  _once_, and caches the result for
         the remainder of this object's life in _packages.
         """
-
-        def _custom_mappings() -> Iterator[Tuple[CustomMapping, str]]:
-            if self.custom_mapping is not None:
-                logger.debug("Applying user-defined mapping from settings.")
-                yield self.custom_mapping, "from settings"
-
-            if self.mapping_paths is not None:
-                for path in self.mapping_paths:
-                    logger.debug(f"Loading user-defined mapping from {path}")
-                    with Path(path).open("rb") as mapping_file:
-                        yield tomllib.load(mapping_file), str(path)
-
-        return accumulate_mappings(self.__class__, _custom_mappings())
+        return accumulate_mappings(self.__class__, self._custom_mappings())
 
     def lookup_packages(self, package_names: Set[str]) -> Dict[str, Package]:
-        """Convert package names to locally available Package objects."""
+        """Convert package names to locally available Package objects.
+
+        With a cache_dir (and unless all packages have already been
+        enumerated), only the requested packages are read from the compiled
+        mapping files.
+        """
+        if self.cache_dir is None or self._packages is not None:
+            packages = self.packages
+        else:
+            only = {Package.normalize_name(name) for name in package_names}
+            packages = accumulate_mappings(self.__class__, self._custom_mappings(only))
         return {
-            name: self.packages[Package.normalize_name(name)]
+            name: packages[Package.normalize_name(name)]
             for name in package_names
-            if Package.normalize_name(name) in self.packages
+            if Package.normalize_name(name) in packages
         }
 
 
+def importlib_dist_details(dist: Distribution) -> DistDetails:
+    """Return the name, version and import names of a package via importlib_metadata.
+
+    This is roughly what importlib_metadata's packages_distributions() does for
+    each package, except that it also handles packages that provide zero
+    import names.
+    """
+    imports = list(
+        _top_level_declared(dist)  # type: ignore[no-untyped-call]
+        or _top_level_inferred(dist)  # type: ignore[no-untyped-call]
+    )
+    return dist.name, dist.version, imports
+
+
+def find_dist_paths(package_dir: Path) -> Iterator[Path]:
+    """Yield the package metadata entries (*.dist-info, etc.) in package_dir."""
+    with os.scandir(package_dir) as entries:
+        for entry in entries:
+            if is_dist_info(package_dir, entry.name):
+                yield Path(entry.path)
+
+
+def dist_name_key(name: str) -> str:
+    """Normalize a package name for matching it against metadata entry names.
+
+    This follows PEP 503, which treats runs of '-', '_' and '.' as equivalent,
+    and thereby also matches the escaped names (PEP 427) found in the names of
+    *.dist-info directories.
+    """
+    return re.sub(r"[-_.]+", "_", name).lower()
+
+
+# Valid project names (PEP 508). The metadata entries of such projects are named
+# in ways that dist_name_key() and dist_path_keys() account for. Other names may
+# have been escaped in other ways by whatever tool installed the package.
+VALID_PROJECT_NAME = re.compile(r"^([A-Z0-9]|[A-Z0-9][A-Z0-9._-]*[A-Z0-9])$", re.I)
+
+
+def dist_path_keys(dist_path: Path) -> Set[str]:
+    """Return the dist_name_key()s that may be encoded in the name of dist_path.
+
+    Metadata entries are named e.g. foo_bar-1.0.dist-info or foo_bar.egg-info,
+    but the package name is not always properly escaped (e.g. foo-bar-1.0...).
+    Hence, return all the '_'-separated prefixes of the normalized entry name,
+    and leave it to the caller to verify the actual name inside the metadata.
+    The EGG-INFO entry of a *.egg directory is named after that directory.
+    """
+    if dist_path.name.lower() == "egg-info":
+        dist_path = dist_path.parent
+    parts = dist_name_key(dist_path.name.rsplit(".", 1)[0]).split("_")
+    return {"_".join(parts[:i]) for i in range(1, len(parts) + 1)}
+
+
+def _parse_name_and_version(
+    lines: Iterable[str],
+) -> Tuple[Optional[str], Optional[str]]:
+    """Parse the Name and Version fields from the lines of a METADATA file.
+
+    Only the header section (before the first empty line) is read, as the rest
+    of the file is the (potentially large) package description.
+    """
+    fields: Dict[str, str] = {}
+    for line in lines:
+        if not line.strip():
+            break
+        key, sep, value = line.partition(":")
+        key = key.lower()
+        if sep and key in {"name", "version"} and key not in fields:
+            fields[key] = value.strip()
+            if len(fields) == 2:  # noqa: PLR2004
+                break
+    return fields.get("name"), fields.get("version")
+
+
+def _top_level_name(record_path: str) -> Optional[str]:
+    """Return the top-level import name provided by a path listed in RECORD.
+
+    This mirrors how importlib_metadata's _top_level_inferred() interprets each
+    path: The first component of a nested path, or the module name of a
+    top-level file. Names that cannot be imported (containing '.') give None.
+    """
+    parts = PurePosixPath(record_path).parts
+    if not parts:
+        return None
+    top = parts[0] if len(parts) > 1 else inspect.getmodulename(parts[0]) or parts[0]
+    return None if "." in top else top
+
+
+def _needs_normalizing(record_path: str) -> bool:
+    """Return True if pathlib would normalize the given path in RECORD."""
+    return record_path.startswith("/") or "./" in record_path or "//" in record_path
+
+
+def _read_record_top_levels(record_path: Path) -> List[str]:
+    """Stream the RECORD file of a package, and return its top-level names.
+
+    As in importlib_metadata, only files that actually exist (relative to the
+    package directory) are considered. However, once a top-level name has been
+    found via one existing file, the remaining files that provide the same
+    name are skipped without further checks. As most lines in RECORD list
+    files nested inside a handful of top-level packages, we typically stop
+    looking at each line after comparing its first path component.
+    """
+    package_dir = record_path.parent.parent
+    found_dirs: Set[str] = set()
+    ret: Dict[str, None] = {}  # used as an ordered set
+    with record_path.open(encoding="utf-8", newline="") as record_file:
+        for line in record_file:
+            if line.startswith('"'):  # quoted path, e.g. containing a comma
+                path = next(csv.reader([line]), [""])[0]
+            else:
+                path = line.partition(",")[0]
+            first, sep, _rest = path.partition("/")
+            if sep and first in found_dirs:
+                continue
+            name = _top_level_name(path)
+            if name is None or name in ret or not (package_dir / path).exists():
+                continue
+            ret[name] = None
+            if sep and not _needs_normalizing(path):
+                found_dirs.add(first)
+    return list(ret)
+
+
+def read_dist_details(dist_path: Path) -> DistDetails:
+    """Return the name, version and import names of the package at dist_path.
+
+    dist_path is a package metadata directory (e.g. foo-1.0.dist-info) in a
+    package directory. This reads the handful of files that we need directly,
+    rather than going through importlib_metadata: METADATA for the name and
+    version, and then top_level.txt if present. Otherwise the import names are
+    inferred from the (existing) files listed in RECORD.
+
+    Anything other than a regular *.dist-info directory (e.g. legacy *.egg-info
+    or EGG-INFO metadata) is passed on to importlib_dist_details().
+    """
+    name, version = None, None
+    metadata_path = dist_path / "METADATA"
+    with suppress(FileNotFoundError, NotADirectoryError), metadata_path.open(
+        encoding="utf-8"
+    ) as metadata_file:
+        name, version = _parse_name_and_version(metadata_file)
+    if name is None or version is None or not dist_path.name.endswith(".dist-info"):
+        return importlib_dist_details(PathDistribution(dist_path))
+
+    with suppress(FileNotFoundError):
+        imports = (dist_path / "top_level.txt").read_text(encoding="utf-8").split()
+        if imports:
+            return name, version, imports
+    try:
+        return name, version, _read_record_top_levels(dist_path / "RECORD")
+    except FileNotFoundError:
+        return importlib_dist_details(PathDistribution(dist_path))
+
+
+def read_wheel_details(wheel_path: Path) -> DistDetails:
+    """Return the name, version and import names of the package in a wheel.
+
+    A wheel is a zip archive that contains the package files along with a
+    *.dist-info directory. We read METADATA and top_level.txt (if present)
+    from this directory. Otherwise, the import names are inferred from the
+    file names in the archive (i.e. what RECORD would list), as available from
+    the zip central directory. Nothing is extracted or installed.
+
+    Raise ValueError if the wheel has no (valid) metadata.
+    """
+    with zipfile.ZipFile(wheel_path) as wheel:
+        names = wheel.namelist()
+        metadata_paths = [
+            name
+            for name in names
+            if name.endswith(".dist-info/METADATA") and name.count("/") == 1
+        ]
+        if len(metadata_paths) != 1:
+            raise ValueError(f"Cannot find package metadata in {wheel_path}")
+        dist_info = metadata_paths[0].rpartition("/")[0]
+        with wheel.open(metadata_paths[0]) as metadata_file:
+            name, version = _parse_name_and_version(
+                io.TextIOWrapper(metadata_file, encoding="utf-8")
+            )
+        if name is None or version is None:
+            raise ValueError(f"Missing name or version in {wheel_path}")
+        with suppress(KeyError):
+            imports = wheel.read(f"{dist_info}/top_level.txt").decode().split()
+            if imports:
+                return name, version, imports
+
+    ret: Dict[str, None] = {}  # used as an ordered set
+    for path in names:
+        top_level = _top_level_name(path.rstrip("/"))
+        if top_level is not None:
+            ret[top_level] = None
+    return name, version, list(ret)
+
+
 class InstalledPackageResolver(BasePackageResolver):
     """Lookup imports exposed by packages installed in a Python environment."""
 
-    def __init__(self) -> None:
+    def __init__(self, cache_dir: Optional[Path] = None) -> None:
         """Lookup packages installed in some Python environments.
 
         Uses importlib_metadata to look up the mapping between packages and
-        their provided import names.
+        their provided import names. If a cache_dir is given, the packages
+        found in each package directory are cached there between runs.
         """
+        self.cache_dir = cache_dir
         # We enumerate packages _once_ and cache the result here:
         self._packages: Optional[Dict[str, Package]] = None
+        # Results of looking up individual packages (None if not installed):
+        self._probed: Dict[str, Optional[Package]] = {}
+
+    def _dists_in_path(
+        self, env_path: str, only: Optional[AbstractSet[str]] = None
+    ) -> Iterator[Tuple[DistDetails, str]]:
+        """Yield details of the packages found in one entry of a search path.
+
+        Also yield the directory in which each package was found. Use the
+        persistent package index for (package) directories when enabled.
+
+        If 'only' is given, look only at the packages whose metadata entries
+        match these dist_name_key()s, without enumerating the other packages.
+        """
+        package_dir = Path(env_path)
+        if not package_dir.is_dir():  # e.g. a zip file on sys.path
+            yield from self._importlib_dists_in_path(env_path, only)
+        elif only is not None:
+            for dist_path in find_dist_paths(package_dir):
+                if only.isdisjoint(dist_path_keys(dist_path)):
+                    continue
+                details = read_dist_details(dist_path)
+                if dist_name_key(details[0]) in only:
+                    yield details, str(package_dir)
+        elif self.cache_dir is not None:
+            index = PackageDirIndex.for_package_dir(self.cache_dir, package_dir)
+            for details in index.dists(read_dist_details):
+                yield details, str(package_dir)
+        else:
+            for dist_path in find_dist_paths(package_dir):
+                yield read_dist_details(dist_path), str(package_dir)
+
+    @staticmethod
+    def _importlib_dists_in_path(
+        env_path: str, only: Optional[AbstractSet[str]] = None
+    ) -> Iterator[Tuple[DistDetails, str]]:
+        """Use importlib_metadata to find packages in one entry of a search path.
+
+        This is used for search path entries that are not plain directories.
+        """
+        # We're reaching into the internals of importlib_metadata here, which
+        # Mypy is not overly fond of, hence "type: ignore"...
+        names: Iterable[Optional[str]] = [None] if only is None else sorted(only)
+        for name in names:
+            context = DistributionFinder.Context(name=name, path=[env_path])  # type: ignore[no-untyped-call]
+            for dist in MetadataPathFinder().find_distributions(context):
+                yield importlib_dist_details(dist), str(dist.locate_file(""))
 
     def _from_one_env(
-        self, env_paths: List[str]
+        self, env_paths: List[str], only: Optional[AbstractSet[str]] = None
     ) -> Iterator[Tuple[CustomMapping, str]]:
         """Return package-name-to-import-names mapping from one Python env.
 
@@ -228,30 +524,37 @@ class InstalledPackageResolver(BasePackageResolver):
 
         Also, we are able to return packages that map to zero import names,
         whereas packages_distributions() cannot.
+
+        If 'only' is given, limit the search as described in _dists_in_path().
         """
         seen = set()  # Package names (normalized) seen earlier in env_paths
 
-        # We're reaching into the internals of importlib_metadata here, which
-        # Mypy is not overly fond of, hence lots of "type: ignore"...
-        context = DistributionFinder.Context(path=env_paths)  # type: ignore[no-untyped-call]
-        for dist in MetadataPathFinder().find_distributions(context):
-            normalized_name = Package.normalize_name(dist.name)
-            parent_dir = dist.locate_file("")
-            if normalized_name in seen:
-                # We already found another instance of this package earlier in
-                # env_paths. Assume that the earlier package is what Python's
-                # import machinery will choose, and that this later package is
-                # not interesting.
-                logger.debug(f"Skip {dist.name} {dist.version} under {parent_dir}")
-                continue
+        for env_path in env_paths:
+            for (name, version, imports), parent_dir in self._dists_in_path(
+                env_path, only
+            ):
+                normalized_name = Package.normalize_name(name)
+                if normalized_name in seen:
+                    # We already found another instance of this package earlier
+                    # in env_paths. Assume that the earlier package is what
+                    # Python's import machinery will choose, and that this later
+                    # package is not interesting.
+                    logger.debug(f"Skip {name} {version} under {parent_dir}")
+                    continue
+
+                logger.debug(f"Found {name} {version} under {parent_dir}")
+                seen.add(normalized_name)
+                yield {name: imports}, parent_dir
 
-            logger.debug(f"Found {dist.name} {dist.version} under {parent_dir}")
-            seen.add(normalized_name)
-            imports = list(
-                _top_level_declared(dist)  # type: ignore[no-untyped-call]
-                or _top_level_inferred(dist)  # type: ignore[no-untyped-call]
-            )
-            yield {dist.name: imports}, str(parent_dir)
+    @abstractmethod
+    def _pyenvs(
+        self, only: Optional[AbstractSet[str]] = None
+    ) -> Iterator[Tuple[CustomMapping, str]]:
+        """Return package-name-to-import-names mappings from all our Python envs.
+
+        If 'only' is given, limit the search as described in _dists_in_path().
+        """
+        raise NotImplementedError
 
     @property
     @abstractmethod
@@ -274,12 +577,37 @@ class InstalledPackageResolver(BasePackageResolver):
         what imports names they provide. This applies to packages that are
         missing from the local environment, or packages where we fail to
         determine its provided import names.
+
+        Unless all packages have already been enumerated, we look only at the
+        package metadata entries whose names match the given package names, and
+        remember the result for each name. We fall back to enumerating all
+        packages only for names that are not found this way, and that are not
+        valid project names (as their metadata entries may be named in ways
+        that we cannot predict).
         """
-        return {
-            name: self.packages[Package.normalize_name(name)]
-            for name in package_names
-            if Package.normalize_name(name) in self.packages
-        }
+        if self._packages is None:
+            to_probe = {
+                name
+                for name in package_names
+                if Package.normalize_name(name) not in self._probed
+            }
+            if to_probe:
+                only = {dist_name_key(name) for name in to_probe}
+                found = accumulate_mappings(self.__class__, self._pyenvs(only))
+                for name in to_probe:
+                    normalized_name = Package.normalize_name(name)
+                    self._probed[normalized_name] = found.get(normalized_name)
+        ret = {}
+        for name in package_names:
+            normalized_name = Package.normalize_name(name)
+            package = self._probed.get(normalized_name)
+            if package is None and (
+                self._packages is not None or not VALID_PROJECT_NAME.match(name)
+            ):
+                package = self.packages.get(normalized_name)
+            if package is not None:
+                ret[name] = package
+        return ret
 
 
 class SysPathPackageResolver(InstalledPackageResolver):
@@ -294,20 +622,33 @@ class SysPathPackageResolver(InstalledPackageResolver):
         (aka. sys.path) _once_, and caches the result for the remainder of this
         object's life.
         """
-        return accumulate_mappings(self.__class__, self._from_one_env(sys.path))
+        return accumulate_mappings(self.__class__, self._pyenvs())
+
+    def _pyenvs(
+        self, only: Optional[AbstractSet[str]] = None
+    ) -> Iterator[Tuple[CustomMapping, str]]:
+        """Return package-name-to-import-names mappings from sys.path."""
+        return self._from_one_env(sys.path, only)
 
 
 class LocalPackageResolver(InstalledPackageResolver):
     """Lookup imports packages installed in the given Python environments."""
 
-    def __init__(self, srcs: AbstractSet[PyEnvSource] = frozenset()) -> None:
+    def __init__(
+        self,
+        srcs: AbstractSet[PyEnvSource] = frozenset(),
+        cache_dir: Optional[Path] = None,
+        jobs: int = 1,
+    ) -> None:
         """Lookup packages installed in the given Python environments.
 
         Use importlib_metadata to look up the mapping between packages and their
-        provided import names.
+        provided import names. With jobs > 1, the package directories are
+        enumerated concurrently in a pool of 'jobs' threads.
         """
-        super().__init__()
+        super().__init__(cache_dir)
         self.package_dirs: Set[Path] = {src.path for src in srcs}
+        self.jobs = jobs
 
     @classmethod
     def find_package_dirs(cls, path: Path) -> Iterator[Path]:  # noqa: C901, PLR0912
@@ -372,12 +713,29 @@ class LocalPackageResolver(InstalledPackageResolver):
         (or the current Python environment) _once_, and caches the result for
         the remainder of this object's life.
         """
+        return accumulate_mappings(self.__class__, self._pyenvs())
+
+    def _pyenvs(
+        self, only: Optional[AbstractSet[str]] = None
+    ) -> Iterator[Tuple[CustomMapping, str]]:
+        """Return package-name-to-import-names mappings from our package dirs.
+
+        The package dirs are visited in sorted order. When enumerating them
+        concurrently, the results are still yielded in this same order.
+        """
+        package_dirs = sorted(self.package_dirs)
+        if self.jobs <= 1 or len(package_dirs) <= 1:
+            for package_dir in package_dirs:
+                yield from self._from_one_env([str(package_dir)], only)
+            return
 
-        def _pyenvs() -> Iterator[Tuple[CustomMapping, str]]:
-            for package_dir in self.package_dirs:
-                yield from self._from_one_env([str(package_dir)])
+        def _one_env(package_dir: Path) -> List[Tuple[CustomMapping, str]]:
+            return list(self._from_one_env([str(package_dir)], only))
 
-        return accumulate_mappings(self.__class__, _pyenvs())
+        logger.debug(f"Enumerating {len(package_dirs)} package dirs in parallel")
+        with ThreadPoolExecutor(max_workers=min(self.jobs, len(package_dirs))) as pool:
+            for mappings in pool.map(_one_env, package_dirs):
+                yield from mappings
 
 
 def pyenv_sources(*pyenv_paths: Path) -> Set[PyEnvSource]:
@@ -397,6 +755,170 @@ def pyenv_sources(*pyenv_paths: Path) -> Set[PyEnvSource]:
     return ret
 
 
+def pip_install(venv_dir: Path, args: List[str]) -> "subprocess.CompletedProcess[str]":
+    """Run `pip install` with the given arguments, using the pip in venv_dir.
+
+    The output from `pip install` is captured (and returned along with the exit
+    code) to prevent polluting our own stdout.
+    """
+    if sys.platform.startswith("win"):  # Windows
+        pip_path = venv_dir / "Scripts" / "pip.exe"
+    else:  # Assume POSIX
+        pip_path = venv_dir / "bin" / "pip"
+    argv = [
+        f"{pip_path}",
+        "install",
+        "--no-deps",
+        "--quiet",
+        "--disable-pip-version-check",
+        *args,
+    ]
+    pip_install_runner = partial(
+        subprocess.run,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        check=False,
+    )
+    return pip_install_runner(argv)
+
+
+class WheelhouseResolver(BasePackageResolver):
+    """Lookup imports exposed by the wheels found in a local wheelhouse.
+
+    A wheelhouse is a directory of wheel (*.whl) files, e.g. as created by
+    `pip wheel` or `pip download`. Packages are resolved by reading the
+    metadata of matching wheels directly, without installing anything, which
+    also works without network access.
+    """
+
+    def __init__(self, wheelhouse: Path) -> None:
+        if not wheelhouse.is_dir():
+            raise UnparseablePathError(
+                ctx="Given wheelhouse is not a directory.", path=wheelhouse
+            )
+        self.wheelhouse = wheelhouse
+
+    def _wheels(self, only: AbstractSet[str]) -> Iterator[Tuple[CustomMapping, str]]:
+        """Return mappings from the wheels that match the given dist_name_key()s.
+
+        Wheels are named {distribution}-{version}(-{build})?-{tags}.whl, where
+        the distribution name is escaped as in *.dist-info directory names.
+        """
+        for wheel_path in sorted(self.wheelhouse.glob("*.whl")):
+            if dist_name_key(wheel_path.name.partition("-")[0]) not in only:
+                continue
+            try:
+                name, version, imports = read_wheel_details(wheel_path)
+            except (OSError, ValueError, zipfile.BadZipFile) as exc:
+                logger.warning(f"Cannot read wheel {wheel_path}: {exc}")
+                continue
+            logger.debug(f"Found {name} {version} in {wheel_path}")
+            yield {name: imports}, str(wheel_path)
+
+    def lookup_packages(self, package_names: Set[str]) -> Dict[str, Package]:
+        """Convert package names into Package objects via the wheelhouse.
+
+        When multiple wheels are found for the same package (e.g. different
+        versions or platforms), their import names are merged.
+        """
+        names = {dist_name_key(name): name for name in package_names}
+        mappings = (
+            ({names[dist_name_key(dist_name)]: imports}, wheel_path)
+            for mapping, wheel_path in self._wheels(names.keys())
+            for dist_name, imports in mapping.items()
+            if dist_name_key(dist_name) in names
+        )
+        packages = accumulate_mappings(self.__class__, mappings)
+        return {
+            name: packages[Package.normalize_name(name)]
+            for name in package_names
+            if Package.normalize_name(name) in packages
+        }
+
+
+def move_installed_files(dist_path: Path, target: Path) -> bool:
+    """Move the files of an installed package into the target directory.
+
+    dist_path is the metadata directory (*.dist-info) of a package that was
+    installed with `pip install --target`, possibly along with other packages.
+    The files listed in its RECORD are moved to the same relative paths under
+    target. Files outside the installation directory (e.g. scripts) are left
+    behind. Return False if there is no RECORD to go by.
+    """
+    package_dir = dist_path.parent
+    try:
+        with (dist_path / "RECORD").open(encoding="utf-8", newline="") as record:
+            paths = [row[0] for row in csv.reader(record) if row]
+    except FileNotFoundError:
+        logger.warning(f"Cannot find the installed files of {dist_path.name}")
+        return False
+    for path in paths:
+        if ".." in PurePosixPath(path).parts or not (package_dir / path).is_file():
+            continue
+        (target / path).parent.mkdir(parents=True, exist_ok=True)
+        (package_dir / path).rename(target / path)
+    return True
+
+
+def _log_install_failure(
+    requirement: str, proc: subprocess.CompletedProcess[str]
+) -> None:
+    logger.warning("Failed to install %s", repr(requirement))
+    if proc.stdout.strip():
+        logger.warning("Output:\n%s", proc.stdout)
+
+
+def bisect_pip_install(
+    install: Callable[[List[str]], subprocess.CompletedProcess[str]],
+    requirements: List[str],
+    *,
+    many_failing: bool = False,
+) -> None:
+    """Retry a failed install of the given requirements, by bisection.
+
+    As `pip install` either installs all of the given requirements or none of
+    them, we split the requirements in half and try to install each half with
+    the given install function. Any half that fails is split again, until the
+    failing requirements have been isolated, and are logged with warning
+    messages. Compared to retrying each requirement individually, this needs
+    far fewer `pip install` runs when only a few requirements are failing.
+
+    When both halves fail on two consecutive levels (many_failing is set when
+    they did on the previous level), failures are not rare (e.g. because none
+    of the requirements can be installed), and bisection would need about twice
+    as many runs as there are requirements. We then retry the requirements in
+    those halves one by one instead.
+    """
+    middle = len(requirements) // 2
+    failed = []
+    for half in (requirements[:middle], requirements[middle:]):
+        if not half:
+            continue
+        proc = install(half)
+        if proc.returncode:
+            failed.append((half, proc))
+    both_failed = len(failed) > 1
+    for half, proc in failed:
+        if len(half) == 1:
+            _log_install_failure(half[0], proc)
+        elif both_failed and many_failing:
+            for requirement in half:
+                retry = install([requirement])
+                if retry.returncode:
+                    _log_install_failure(requirement, retry)
+        else:
+            bisect_pip_install(install, half, many_failing=both_failed)
+
+
+def retry_pip_install(venv_dir: Path, requirements: List[str]) -> None:
+    """Retry a failed `pip install` of the given requirements into venv_dir.
+
+    See bisect_pip_install() for how the failing requirements are isolated.
+    """
+    bisect_pip_install(partial(pip_install, venv_dir), requirements)
+
+
 class TemporaryPipInstallResolver(BasePackageResolver):
     """Resolve packages by installing them in to a temporary venv.
 
@@ -405,11 +927,29 @@ class TemporaryPipInstallResolver(BasePackageResolver):
     `pip install`ing the packages into this venv, and then resolving the
     packages in this venv. The venv is automatically deleted before as soon as
     the packages have been resolved.
+
+    If a cache_dir is given, each package is instead installed once into its
+    own entry in an InstalledRequirementsCache, from which subsequent runs can
+    resolve it without running `pip install` at all.
     """
 
     # This is only used in tests by `test_resolver`
     cached_venv: Optional[Path] = None
 
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_cache_size: int = DEFAULT_MAX_INSTALL_CACHE_SIZE,
+        failed_install_ttl: int = FAILED_INSTALL_TTL,
+    ) -> None:
+        self.cache = (
+            None
+            if cache_dir is None
+            else InstalledRequirementsCache.in_cache_dir(
+                cache_dir, max_cache_size, failed_install_ttl
+            )
+        )
+
     @staticmethod
     @contextmanager
     def installed_requirements(
@@ -425,38 +965,13 @@ class TemporaryPipInstallResolver(BasePackageResolver):
         marker_file = venv_dir / ".installed"
         if not marker_file.is_file():
             venv.create(venv_dir, clear=True, with_pip=True)
-        # Capture output from `pip install` to prevent polluting our own stdout
-        pip_install_runner = partial(
-            subprocess.run,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            check=False,
-        )
-        if sys.platform.startswith("win"):  # Windows
-            pip_path = venv_dir / "Scripts" / "pip.exe"
-        else:  # Assume POSIX
-            pip_path = venv_dir / "bin" / "pip"
-
-        argv = [
-            f"{pip_path}",
-            "install",
-            "--no-deps",
-            "--quiet",
-            "--disable-pip-version-check",
-        ]
-        proc = pip_install_runner(argv + requirements)
+        proc = pip_install(venv_dir, requirements)
         if proc.returncode:  # pip install failed
-            logger.warning("Command failed: %s", argv + requirements)
+            logger.warning("Command failed: %s", proc.args)
             if proc.stdout.strip():
                 logger.warning("Output:\n%s", proc.stdout)
-            logger.info("Retrying each requirement individually...")
-            for req in requirements:
-                proc = pip_install_runner([*argv, req])
-                if proc.returncode:  # pip install failed
-                    logger.warning("Failed to install %s", repr(req))
-                    if proc.stdout.strip():
-                        logger.warning("Output:\n%s", proc.stdout)
+            logger.info("Retrying in smaller batches to isolate failures...")
+            retry_pip_install(venv_dir, requirements)
         marker_file.touch()
         yield venv_dir
 
@@ -477,14 +992,127 @@ class TemporaryPipInstallResolver(BasePackageResolver):
             with cls.installed_requirements(Path(tmpdir), requirements) as venv_dir:
                 yield venv_dir
 
+    @staticmethod
+    def _install_batches(
+        venv_dir: Path, requirements: List[str], parent_dir: Path
+    ) -> List[Path]:
+        """Install the given requirements with `pip install --target`.
+
+        All requirements are installed together into a new directory inside
+        parent_dir. If that fails, the failing requirements are isolated with
+        bisect_pip_install(), and logged with warning messages.
+
+        Return the target directory of each successful `pip install`.
+        """
+        targets = []
+
+        def install(batch: List[str]) -> subprocess.CompletedProcess[str]:
+            target = Path(tempfile.mkdtemp(dir=parent_dir))
+            proc = pip_install(venv_dir, ["--target", str(target), *batch])
+            if not proc.returncode:
+                targets.append(target)
+            return proc
+
+        proc = install(requirements)
+        if proc.returncode and len(requirements) > 1:
+            logger.info("Retrying in smaller batches to isolate failures...")
+            bisect_pip_install(install, requirements)
+        elif proc.returncode:
+            _log_install_failure(requirements[0], proc)
+        return targets
+
+    def _install_missing(
+        self, cache: InstalledRequirementsCache, package_names: List[str]
+    ) -> Dict[str, Path]:
+        """Install the given packages into new install cache entries.
+
+        The packages are installed together with one `pip install` (using pip
+        from a temporary venv), and then moved into one cache entry each.
+        Packages that fail to install are recorded as such in the cache, unless
+        nothing could be installed at all (e.g. when PyPI is unreachable), in
+        which case the failure is most likely not specific to these packages.
+
+        Return a dict mapping package names to their new cache entries.
+        """
+        ret = {}
+        with tempfile.TemporaryDirectory() as venv_dir, cache.temp_dir() as tmpdir:
+            venv.create(venv_dir, clear=True, with_pip=True)
+            installed: Dict[str, Path] = {}  # dist_name_key() -> *.dist-info
+            for target in self._install_batches(
+                Path(venv_dir), package_names, Path(tmpdir)
+            ):
+                for dist_path in find_dist_paths(target):
+                    dist_name, _version, _imports = read_dist_details(dist_path)
+                    installed.setdefault(dist_name_key(dist_name), dist_path)
+            for name in package_names:
+                key = dist_name_key(name)
+                if key not in installed:
+                    if installed:
+                        cache.add_failure(key)
+                    continue
+                install = partial(move_installed_files, installed[key])
+                entry = cache.add(key, install)
+                if entry is not None:
+                    ret[name] = entry
+        return ret
+
+    def _lookup_cached(
+        self, cache: InstalledRequirementsCache, package_names: Set[str]
+    ) -> Dict[str, Package]:
+        """Convert package names into Package objects via the install cache.
+
+        Cache entries are keyed by the dist_name_key() of each package name.
+        Packages that are missing from the cache are first `pip install`ed
+        into new cache entries (see _install_missing()), after which the least
+        recently used entries are evicted if the cache is too big. Packages
+        that recently failed to install are not retried.
+        """
+        entries: Dict[str, Path] = {}
+        missing: List[str] = []
+        for name in sorted(package_names):
+            key = dist_name_key(name)
+            entry = cache.lookup(key)
+            if entry is not None:
+                entries[name] = entry
+            elif cache.recently_failed(key):
+                logger.warning(
+                    f"Not installing {name!r}, as it recently failed to install."
+                    " Pass --failed-install-ttl=0 to try again."
+                )
+            else:
+                missing.append(name)
+        if missing:
+            logger.info(f"Installing dependencies into {cache.path}.")
+            entries.update(self._install_missing(cache, missing))
+            cache.evict(keep=set(entries.values()))
+        logger.info(
+            f"Install cache: {cache.hits} hits, {cache.misses} misses ({cache.path})"
+        )
+
+        ret = {}
+        for name, entry in entries.items():
+            for dist_path in find_dist_paths(entry):
+                dist_name, _version, imports = read_dist_details(dist_path)
+                if Package.normalize_name(dist_name) == Package.normalize_name(name):
+                    ret[name] = Package(
+                        name,
+                        set(imports),
+                        self.__class__,
+                        "Provided by cached `pip install`",
+                    )
+                    break
+        return ret
+
     def lookup_packages(self, package_names: Set[str]) -> Dict[str, Package]:
         """Convert package names into Package objects via temporary pip install.
 
         Use the temp_installed_requirements() above to `pip install` the given
         package names into a temporary venv, and then use LocalPackageResolver
         on this venv to provide the Package objects that correspond to the
-        package names.
+        package names. With a cache_dir, use the install cache instead.
         """
+        if self.cached_venv is None and self.cache is not None:
+            return self._lookup_cached(self.cache, package_names)
         if self.cached_venv is None:
             installed = self.temp_installed_requirements
             logger.info("Installing dependencies into a temporary Python environment.")
@@ -527,30 +1155,48 @@ class IdentityMapping(BasePackageResolver):
         return {name: self.lookup_package(name) for name in package_names}
 
 
-def setup_resolvers(
+def setup_resolvers(  # noqa: PLR0913
     *,
     custom_mapping_files: Optional[Set[Path]] = None,
     custom_mapping: Optional[CustomMapping] = None,
     pyenv_srcs: AbstractSet[PyEnvSource] = frozenset(),
     use_current_env: bool = False,
     install_deps: bool = False,
+    cache_dir: Optional[Path] = None,
+    jobs: int = 1,
+    max_install_cache_size: int = DEFAULT_MAX_INSTALL_CACHE_SIZE,
+    failed_install_ttl: int = FAILED_INSTALL_TTL,
+    wheelhouse: Optional[Path] = None,
 ) -> Iterator[BasePackageResolver]:
     """Configure a sequence of resolvers according to the given arguments.
 
     This defines the sequence of resolvers that we will use to map dependencies
-    into provided import names.
+    into provided import names. If cache_dir is given, the packages found in
+    Python environments are cached there between runs, as are the compiled
+    custom mapping files, and the packages installed with install_deps (up to
+    max_install_cache_size bytes). Packages that fail to install are not retried
+    for failed_install_ttl seconds. With jobs > 1, multiple Python environments
+    are enumerated concurrently. If a wheelhouse directory is given, the wheels
+    found there are used to resolve packages that are not installed.
     """
     yield UserDefinedMapping(
-        mapping_paths=custom_mapping_files or set(), custom_mapping=custom_mapping
+        mapping_paths=custom_mapping_files or set(),
+        custom_mapping=custom_mapping,
+        cache_dir=cache_dir,
     )
 
-    yield LocalPackageResolver(pyenv_srcs)
+    yield LocalPackageResolver(pyenv_srcs, cache_dir, jobs)
 
     if use_current_env:
-        yield SysPathPackageResolver()
+        yield SysPathPackageResolver(cache_dir)
+
+    if wheelhouse is not None:
+        yield WheelhouseResolver(wheelhouse)
 
     if install_deps:
-        yield TemporaryPipInstallResolver()
+        yield TemporaryPipInstallResolver(
+            cache_dir, max_install_cache_size, failed_install_ttl
+        )
     else:
         yield IdentityMapping()
 
@@ -585,6 +1231,21 @@ def resolve_dependencies(
     return ret
 
 
+def import_providers(resolved_deps: Dict[str, Package]) -> Dict[str, Set[str]]:
+    """Map import names to the resolved dependencies that provide them.
+
+    This inverts the mapping in 'resolved_deps', so that each import name maps
+    to the dependency names whose packages provide it. Import names for which a
+    package provides type stubs are included, i.e. "foo" is provided by a
+    package with "foo-stubs" among its import names.
+    """
+    ret: Dict[str, Set[str]] = {}
+    for dep_name, package in resolved_deps.items():
+        for import_name in package.import_names | package.has_type_stubs():
+            ret.setdefault(import_name, set()).add(dep_name)
+    return ret
+
+
 def validate_pyenv_source(path: Path) -> Optional[Set[PyEnvSource]]:
     """Check if the given directory path is a valid Python environment.
 
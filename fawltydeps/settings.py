@@ -169,6 +169,13 @@ class Settings(BaseSettings):
     exclude_from: Set[Path] = set()
     verbosity: int = 0
     custom_mapping_file: Set[Path] = set()
+    jobs: int = 1
+    cache_dir: Optional[Path] = None
+    max_install_cache_size: int = 1024  # MiB
+    failed_install_ttl: int = 24  # hours
+    wheelhouse: Optional[Path] = None
+    use_isort: bool = False
+    use_git_index: bool = False
 
     # Class vars: these can not be overridden in the same way as above, only by
     # passing keyword args to Settings.config(). This is because they change the
@@ -2,11 +2,15 @@
 
 import logging
 from pathlib import Path
-from typing import AbstractSet, Iterator, Optional, Set, Tuple, Type, Union
+from typing import AbstractSet, Dict, Iterator, List, Optional, Set, Tuple, Type, Union
 
 from fawltydeps.dir_traversal import DirectoryTraversal
-from fawltydeps.extract_declared_dependencies import validate_deps_source
+from fawltydeps.extract_declared_dependencies import (
+    first_applicable_parser,
+    validate_deps_source,
+)
 from fawltydeps.extract_imports import validate_code_source
+from fawltydeps.git_index import GitListing
 from fawltydeps.gitignore_parser import RuleError as ExcludeRuleError
 from fawltydeps.packages import validate_pyenv_source
 from fawltydeps.settings import Settings
@@ -57,6 +61,10 @@ def find_sources(  # noqa: C901, PLR0912, PLR0915
     - Directories should only be traverse _once_. This includes the case of
       symlinks-to-dirs. We should be resistant to infinite traversal loops
       caused by symlinks. (This is handled by DirectoryTraversal)
+    - With settings.use_git_index, directories inside a git work tree are not
+      traversed. Instead, we look at the files that git knows about (tracked
+      files, and untracked files that are not ignored). See
+      _find_sources_with_git() below.
     """
     logger.debug("find_sources() Looking for sources under:")
     logger.debug(f"    code:         {settings.code}")
@@ -71,7 +79,7 @@ def find_sources(  # noqa: C901, PLR0912, PLR0915
         if isinstance(path, Path)
     }
 
-    traversal: DirectoryTraversal[AttachedData] = DirectoryTraversal()
+    traversal: DirectoryTraversal[AttachedData] = DirectoryTraversal(jobs=settings.jobs)
     for pattern in settings.exclude:
         try:
             traversal.exclude(pattern)
@@ -100,6 +108,10 @@ def find_sources(  # noqa: C901, PLR0912, PLR0915
                 # of this overlap, so log a warning:
                 logger.warning(f"{path} is both requested and excluded. Will include.")
 
+    # Directories to traverse, with the data to attach to each of them
+    to_add: Dict[Path, List[AttachedData]] = {}
+    pyenv_dirs: Set[Path] = set()  # Python environments given directly
+
     for path_or_special in settings.code if CodeSource in source_types else []:
         # exceptions raised by validate_code_source() are propagated here
         validated: Optional[Source] = validate_code_source(path_or_special)
@@ -110,7 +122,7 @@ def find_sources(  # noqa: C901, PLR0912, PLR0915
             # sanity check: convince mypy that SpecialPath is already handled
             assert isinstance(path_or_special, Path)  # noqa: S101, sanity check
             # record also base dir for later
-            traversal.add(path_or_special, (CodeSource, path_or_special))
+            to_add.setdefault(path_or_special, []).append((CodeSource, path_or_special))
 
     for path in settings.deps if DepsSource in source_types else []:
         # exceptions raised by validate_deps_source() are propagated here
@@ -121,7 +133,7 @@ def find_sources(  # noqa: C901, PLR0912, PLR0915
             logger.debug(f"find_sources() Found {validated}")
             yield validated
         else:  # must traverse directory
-            traversal.add(path, DepsSource)
+            to_add.setdefault(path, []).append(DepsSource)
 
     for path in settings.pyenvs if PyEnvSource in source_types else []:
         # exceptions raised by validate_pyenv_source() are propagated here
@@ -130,8 +142,15 @@ def find_sources(  # noqa: C901, PLR0912, PLR0915
             logger.debug(f"find_sources() Found {package_dirs}")
             yield from package_dirs
             traversal.skip_dir(path)  # disable traversal of path below
+            pyenv_dirs.add(path)
         else:  # must traverse directory to find Python environments
-            traversal.add(path, PyEnvSource)
+            to_add.setdefault(path, []).append(PyEnvSource)
+
+    if settings.use_git_index:
+        yield from _find_sources_with_git(to_add, pyenv_dirs, traversal, settings)
+    else:
+        for path, attached in to_add.items():
+            traversal.add(path, *attached)
 
     for step in traversal.traverse():
         # Extract the Source types we're looking for in this directory.
@@ -175,3 +194,122 @@ def find_sources(  # noqa: C901, PLR0912, PLR0915
                     yield validated
                 except UnparseablePathError:  # don't abort directory walk for this
                     pass
+
+
+def _find_sources_with_git(
+    to_add: Dict[Path, List[AttachedData]],
+    pyenv_dirs: Set[Path],
+    traversal: DirectoryTraversal[AttachedData],
+    settings: Settings,
+) -> Iterator[Source]:
+    """Find sources in the given directories, using the paths known to git.
+
+    Directories that are not inside a git work tree are .add()ed to the given
+    traversal instead. The same goes for directories that are nested within
+    (or that contain) one of the other given directories, as these would need
+    to have the attached data of both directories merged.
+    """
+    abs_paths = {path: path.absolute() for path in to_add}
+    skip_abs_paths = {path.absolute() for path in pyenv_dirs}
+    for path, attached in to_add.items():
+        nested = any(
+            other != path
+            and (
+                abs_paths[other] == abs_paths[path]
+                or abs_paths[other] in abs_paths[path].parents
+                or abs_paths[path] in abs_paths[other].parents
+            )
+            for other in to_add
+        )
+        listing = None if nested else GitListing.from_dir(path)
+        if listing is None:
+            traversal.add(path, *attached)
+        else:
+            yield from _sources_from_git_listing(
+                listing, attached, skip_abs_paths, traversal, settings
+            )
+
+
+def _sources_from_git_listing(
+    listing: GitListing,
+    attached: List[AttachedData],
+    skip_abs_paths: Set[Path],
+    traversal: DirectoryTraversal[AttachedData],
+    settings: Settings,
+) -> Iterator[Source]:
+    """Yield the sources found in the given listing of a directory from git.
+
+    This follows the same rules as the traversal in find_sources() above:
+    Python environments are looked for among all subdirectories (excluded
+    or not) of the directories that we look inside, and we do not look for
+    sources inside excluded directories, or inside Python environments. In
+    addition, we do not look inside the directories that are ignored by git.
+    """
+    types = {t[0] if isinstance(t, tuple) else t for t in attached}
+
+    # Visit parent dirs before their subdirs, to find the dirs to look inside
+    included_dirs = {listing.dir_path}
+    dirs = listing.parent_dirs() | listing.subtrees | listing.ignored_dirs
+    for dir_path in sorted(dirs - {listing.dir_path}):
+        if dir_path.parent not in included_dirs:
+            continue
+        if skip_abs_paths and dir_path.absolute() in skip_abs_paths:
+            continue  # Python environment given directly, already found
+        if PyEnvSource in types:
+            package_dirs = validate_pyenv_source(dir_path)
+            if package_dirs is not None:  # pyenvs found here
+                yield from package_dirs
+                continue
+        if dir_path in listing.ignored_dirs or traversal.is_excluded(
+            dir_path, is_dir=True
+        ):
+            continue
+        if dir_path in listing.subtrees:  # must traverse this ourselves
+            traversal.add(dir_path, *attached)
+            continue
+        included_dirs.add(dir_path)
+
+    yield from _sources_from_git_files(
+        listing, included_dirs, attached, traversal, settings
+    )
+
+
+def _sources_from_git_files(
+    listing: GitListing,
+    included_dirs: Set[Path],
+    attached: List[AttachedData],
+    traversal: DirectoryTraversal[AttachedData],
+    settings: Settings,
+) -> Iterator[Source]:
+    """Yield the code/deps sources among the files in the given listing.
+
+    Only files directly inside one of the given 'included_dirs' are considered.
+    """
+    types = {t[0] if isinstance(t, tuple) else t for t in attached}
+    # Retrieve base_dir from the last CodeSource in attached (if any)
+    base_dir = next((t[1] for t in reversed(attached) if isinstance(t, tuple)), None)
+    for path in sorted(listing.files):
+        if path.parent not in included_dirs:
+            continue
+        # Check file suffix/name first, to skip most files without a stat()
+        is_code = CodeSource in types and path.suffix in {".py", ".ipynb"}
+        is_deps = DepsSource in types and first_applicable_parser(path) is not None
+        if not (is_code or is_deps) or traversal.is_excluded(path, is_dir=False):
+            continue
+        # Files that were deleted from the work tree are skipped here:
+        if is_code:
+            try:
+                code_source = validate_code_source(path, base_dir)
+                assert code_source is not None  # noqa: S101, sanity check
+                yield code_source
+            except UnparseablePathError:
+                pass
+        if is_deps:
+            try:
+                deps_source = validate_deps_source(
+                    path, settings.deps_parser_choice, filter_by_parser=True
+                )
+                assert deps_source is not None  # noqa: S101, sanity check
+                yield deps_source
+            except UnparseablePathError:
+                pass
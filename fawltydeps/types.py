@@ -4,14 +4,12 @@ from __future__ import annotations
 
 import sys
 from abc import ABC, abstractmethod
-from dataclasses import asdict, dataclass, field, replace
+from dataclasses import FrozenInstanceError, dataclass, field
 from enum import Enum
-from functools import total_ordering
+from functools import lru_cache, total_ordering
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple, Type, Union
 
-from fawltydeps.utils import hide_dataclass_fields
-
 if sys.version_info >= (3, 8):
     from typing import Literal
 else:
@@ -179,8 +177,17 @@ class PyEnvSource(Source):
         return f"{self.path}"
 
 
+@lru_cache(maxsize=4096)
+def path_repr(path: PathOrSpecial) -> str:
+    """Return the (interned) repr() of the given path, used in sort keys.
+
+    All the Locations within a file share the same path, so avoid re-creating
+    the same string for each of them.
+    """
+    return sys.intern(repr(path))
+
+
 @total_ordering
-@dataclass(frozen=True)
 class Location:
     """Reference to a source location, e.g. a file, a line within a file, etc.
 
@@ -198,24 +205,37 @@ class Location:
 
     Instances have a string representation that reflect the level of detail
     provided, and they are sortable.
+
+    Instances are immutable, and compact: Millions of these may be created when
+    analyzing large projects, so we use __slots__ instead of a (per-instance)
+    __dict__, and only compute the sort key when it is first needed.
     """
 
+    __slots__ = ("path", "cellno", "lineno", "_sort_key")
+
     path: PathOrSpecial
-    cellno: Optional[int] = None
-    lineno: Optional[int] = None
-
-    # It would be ideal to use the automatic __eq__, __lt__, etc. methods that
-    # @dataclass can provide for us, thus making Location objects automatically
-    # orderable/sortable. However, the automatic implementations end up directly
-    # comparing tuples of our members, which fails when some of those members
-    # are None, with errors like e.g.: TypeError: '<' not supported between
-    # instances of 'PosixPath' and 'NoneType'.
-    # Instead, we must implement our own. Do so based on a comparable/sortable
-    # string created/cached together with the instance.
-    _sort_key: Tuple[str, int, int] = field(init=False, repr=False)
+    cellno: Optional[int]
+    lineno: Optional[int]
+    _sort_key: Tuple[str, int, int]
 
-    def __post_init__(self) -> None:
-        """Initialize a sort key that uniquely reflects this instance.
+    def __init__(
+        self,
+        path: PathOrSpecial,
+        cellno: Optional[int] = None,
+        lineno: Optional[int] = None,
+    ):
+        object.__setattr__(self, "path", path)
+        object.__setattr__(self, "cellno", cellno)
+        object.__setattr__(self, "lineno", lineno)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def sort_key(self) -> Tuple[str, int, int]:
+        """Return (and cache) a sort key that uniquely reflects this instance.
 
         This is used to compare Location objects, and determine how they sort
         relative to each other. The following must hold:
@@ -223,30 +243,34 @@ class Location:
         - Member order matters: sort by path, then cellno, then lineno
         - Unspecified members sort together, and separate from specified members
         - Paths sort alphabetically, the other members sort numerically
-        """
-        sortable_tuple = (
-            repr(self.path),
-            -1 if self.cellno is None else self.cellno,
-            -1 if self.lineno is None else self.lineno,
-        )
-        object.__setattr__(self, "_sort_key", sortable_tuple)
 
-        # Do magic to hide unset/None members from JSON representation
-        unset = [attr for attr, value in asdict(self).items() if value is None]
-        hide_dataclass_fields(self, "_sort_key", *unset)
+        We cannot simply compare tuples of our members, as that fails when some
+        of those members are None, with errors like e.g.: TypeError: '<' not
+        supported between instances of 'PosixPath' and 'NoneType'.
+        """
+        try:
+            return self._sort_key
+        except AttributeError:
+            key = (
+                path_repr(self.path),
+                -1 if self.cellno is None else self.cellno,
+                -1 if self.lineno is None else self.lineno,
+            )
+            object.__setattr__(self, "_sort_key", key)
+            return key
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Location):
             return NotImplemented
-        return self._sort_key == other._sort_key
+        return self.sort_key() == other.sort_key()
 
     def __lt__(self, other: object) -> bool:
         if not isinstance(other, Location):
             return NotImplemented
-        return self._sort_key < other._sort_key
+        return self.sort_key() < other.sort_key()
 
     def __hash__(self) -> int:
-        return hash(self._sort_key)
+        return hash(self.sort_key())
 
     def __str__(self) -> str:
         ret = str(self.path)
@@ -256,18 +280,63 @@ class Location:
             ret += f":{self.lineno}"
         return ret
 
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(path={self.path!r},"
+            f" cellno={self.cellno!r}, lineno={self.lineno!r})"
+        )
+
+    def __reduce__(
+        self,
+    ) -> Tuple[Type[Location], Tuple[PathOrSpecial, Optional[int], Optional[int]]]:
+        """Support pickling, e.g. when passing Locations between processes."""
+        return (self.__class__, (self.path, self.cellno, self.lineno))
+
+    def __copy__(self) -> Location:
+        return self  # immutable
+
+    def __deepcopy__(self, _memo: Dict[int, object]) -> Location:
+        return self  # immutable
+
+    def to_dict(self) -> Dict[str, Union[PathOrSpecial, int]]:
+        """Return the members of this instance that are set, e.g. for JSON."""
+        ret: Dict[str, Union[PathOrSpecial, int]] = {"path": self.path}
+        if self.cellno is not None:
+            ret["cellno"] = self.cellno
+        if self.lineno is not None:
+            ret["lineno"] = self.lineno
+        return ret
+
     def supply(self, **changes: int) -> Location:
         """Create a new Location that contains additional information."""
-        return replace(self, **changes)
+        return Location(
+            self.path,
+            changes.get("cellno", self.cellno),
+            changes.get("lineno", self.lineno),
+        )
 
 
 @dataclass(eq=True, frozen=True, order=True)
 class ParsedImport:
-    """Import parsed from the source code."""
+    """Import parsed from the source code.
+
+    Like Location, this is kept compact (using __slots__), as there may be
+    millions of these. The same few module names are imported over and over,
+    so we also intern the names.
+    """
+
+    __slots__ = ("name", "source")
 
     name: str
     source: Location
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "name", sys.intern(self.name))
+
+    def __reduce__(self) -> Tuple[Type[ParsedImport], Tuple[str, Location]]:
+        """Support pickling, which does not cope with frozen __slots__."""
+        return (self.__class__, (self.name, self.source))
+
 
 @dataclass(eq=True, frozen=True, order=True)
 class DeclaredDependency:
@@ -2,10 +2,9 @@
 
 import logging
 import sys
-from dataclasses import is_dataclass
 from functools import wraps
 from pathlib import Path
-from typing import Callable, Iterator, Optional, TypeVar, no_type_check
+from typing import Callable, Generic, Iterator, Optional, TypeVar, no_type_check
 
 import importlib_metadata
 
@@ -32,19 +31,24 @@ def dirs_between(parent: Path, child: Path) -> Iterator[Path]:
         yield from dirs_between(parent, child.parent)
 
 
-def hide_dataclass_fields(instance: object, *field_names: str) -> None:
-    """Make a dataclass field invisible to asdict() and astuple().
+class LazyStr(Generic[T]):
+    """Defer calling a function until its result is needed as a string.
 
-    This also affects e.g. when serializing this dataclass instance to JSON.
+    This is meant for expensive debug log messages: Pass a LazyStr as an
+    argument to one of the logger methods (with %-style formatting), and the
+    function will only be called if the message is actually emitted:
+
+        logger.debug("Parsed %s", LazyStr(ast.dump, node))
     """
-    if not is_dataclass(instance) or isinstance(instance, type):
-        raise TypeError(f"{instance!r} is not a dataclass instance")
-    remaining_fields = {
-        name: value
-        for name, value in instance.__dataclass_fields__.items()
-        if name not in field_names
-    }
-    object.__setattr__(instance, "__dataclass_fields__", remaining_fields)
+
+    __slots__ = ("func", "arg")
+
+    def __init__(self, func: Callable[[T], str], arg: T):
+        self.func = func
+        self.arg = arg
+
+    def __str__(self) -> str:
+        return self.func(self.arg)
 
 
 def calculated_once(method: Callable[[Instance], T]) -> Callable[[Instance], T]:
@@ -0,0 +1,457 @@
+"""Test the persistent caching of results between runs."""
+
+import logging
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from fawltydeps.cache import (
+    CompiledMapping,
+    ImportCache,
+    InstalledRequirementsCache,
+    PackageDirIndex,
+    default_cache_dir,
+)
+from fawltydeps.extract_imports import parse_sources
+from fawltydeps.packages import (
+    LocalPackageResolver,
+    Package,
+    TemporaryPipInstallResolver,
+    UserDefinedMapping,
+    pyenv_sources,
+)
+from fawltydeps.types import CodeSource, Location, ParsedImport
+
+
+def parse_with_cache(cache_dir, code_sources, *, use_isort=False):
+    cache = ImportCache.for_code_paths(cache_dir, {Path()}, use_isort=use_isort)
+    imports = list(parse_sources(code_sources, cache=cache, use_isort=use_isort))
+    cache.save()
+    return imports, (cache.hits, cache.misses)
+
+
+@pytest.fixture()
+def project_with_cache(write_tmp_files, tmp_path_factory):
+    project = write_tmp_files(
+        {
+            "app/main.py": "import numpy\nimport foo\n",
+            "app/other.py": "import pandas\n",
+        }
+    )
+    sources = [
+        CodeSource(project / "app/main.py", project),
+        CodeSource(project / "app/other.py", project),
+    ]
+    # Keep the cache outside the project, to not affect its first-party context
+    return project, sources, tmp_path_factory.mktemp("cache")
+
+
+def test_default_cache_dir__uses_xdg_cache_home(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert default_cache_dir() == tmp_path / "fawltydeps"
+
+
+def test_import_cache__second_run__hits_all_and_returns_same_imports(
+    project_with_cache,
+):
+    project, sources, cache_dir = project_with_cache
+    expect = [
+        ParsedImport("numpy", Location(project / "app/main.py", lineno=1)),
+        ParsedImport("foo", Location(project / "app/main.py", lineno=2)),
+        ParsedImport("pandas", Location(project / "app/other.py", lineno=1)),
+    ]
+    assert parse_with_cache(cache_dir, sources) == (expect, (0, 2))
+    assert parse_with_cache(cache_dir, sources) == (expect, (2, 0))
+
+
+def test_import_cache__modified_file__is_parsed_again(project_with_cache):
+    project, sources, cache_dir = project_with_cache
+    parse_with_cache(cache_dir, sources)
+
+    (project / "app/other.py").write_text("import scipy\nimport pandas\n")
+    imports, stats = parse_with_cache(cache_dir, sources)
+    assert stats == (1, 1)
+    assert [i.name for i in imports] == ["numpy", "foo", "scipy", "pandas"]
+
+
+def test_import_cache__touched_but_unmodified_file__is_a_hit(project_with_cache):
+    project, sources, cache_dir = project_with_cache
+    expect, _ = parse_with_cache(cache_dir, sources)
+
+    path = project / "app/main.py"
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert parse_with_cache(cache_dir, sources) == (expect, (2, 0))
+
+
+def test_import_cache__new_first_party_module__invalidates_entries(
+    project_with_cache,
+):
+    project, sources, cache_dir = project_with_cache
+    parse_with_cache(cache_dir, sources)
+
+    (project / "app/foo.py").touch()  # 'import foo' is now a first-party import
+    _imports, stats = parse_with_cache(cache_dir, sources)
+    assert stats == (0, 2)
+
+
+def test_import_cache__switching_use_isort__invalidates_entries(
+    project_with_cache,
+):
+    _project, sources, cache_dir = project_with_cache
+    expect, _ = parse_with_cache(cache_dir, sources)
+    assert parse_with_cache(cache_dir, sources, use_isort=True) == (expect, (0, 2))
+    assert parse_with_cache(cache_dir, sources, use_isort=True) == (expect, (2, 0))
+
+
+def test_import_cache__duplicate_sources__are_parsed_and_stored(
+    project_with_cache,
+):
+    project, sources, cache_dir = project_with_cache
+    expect = [
+        ParsedImport("numpy", Location(project / "app/main.py", lineno=1)),
+        ParsedImport("foo", Location(project / "app/main.py", lineno=2)),
+    ]
+    assert parse_with_cache(cache_dir, sources[:1] * 2) == (expect * 2, (0, 2))
+    assert parse_with_cache(cache_dir, sources[:1]) == (expect, (1, 0))
+
+
+def test_import_cache__corrupt_cache_file__is_ignored(project_with_cache, caplog):
+    _project, sources, cache_dir = project_with_cache
+    expect, _ = parse_with_cache(cache_dir, sources)
+    for cache_file in cache_dir.iterdir():
+        cache_file.write_text("{ not valid JSON")
+
+    caplog.set_level(logging.DEBUG)
+    assert parse_with_cache(cache_dir, sources) == (expect, (0, 2))
+    assert "Ignoring unreadable import cache" in caplog.text
+
+
+def read_package_dir(cache_dir, site_dir):
+    read = []
+
+    def read_dist(path):
+        read.append(path.name)
+        return (path.name.split("-")[0], "1.2.3", [])
+
+    index = PackageDirIndex.for_package_dir(cache_dir, site_dir)
+    return index.dists(read_dist), sorted(read)
+
+
+def test_package_dir_index__second_run__reads_no_packages(fake_venv, tmp_path):
+    _venv_dir, site_dir = fake_venv({"foo": {"foo"}, "bar": {"bar"}})
+    dists, read = read_package_dir(tmp_path / "cache", site_dir)
+    assert sorted(dists) == [("bar", "1.2.3", []), ("foo", "1.2.3", [])]
+    assert read == ["bar-1.2.3.dist-info", "foo-1.2.3.dist-info"]
+    assert read_package_dir(tmp_path / "cache", site_dir) == (dists, [])
+
+
+def test_package_dir_index__added_and_removed_packages__reads_only_new_ones(
+    fake_venv, tmp_path
+):
+    venv_dir, site_dir = fake_venv({"foo": {"foo"}, "bar": {"bar"}})
+    read_package_dir(tmp_path / "cache", site_dir)
+
+    for path in (site_dir / "bar-1.2.3.dist-info").iterdir():
+        path.unlink()
+    (site_dir / "bar-1.2.3.dist-info").rmdir()
+    fake_venv({"baz": {"baz"}}, venv_dir=venv_dir)
+    dists, read = read_package_dir(tmp_path / "cache", site_dir)
+    assert sorted(dists) == [("baz", "1.2.3", []), ("foo", "1.2.3", [])]
+    assert read == ["baz-1.2.3.dist-info"]
+
+
+def test_package_dir_index__modified_package__is_read_again(fake_venv, tmp_path):
+    _venv_dir, site_dir = fake_venv({"foo": {"foo"}, "bar": {"bar"}})
+    read_package_dir(tmp_path / "cache", site_dir)
+
+    dist_info = site_dir / "foo-1.2.3.dist-info"
+    stat = dist_info.stat()
+    os.utime(dist_info, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    stat = site_dir.stat()
+    os.utime(site_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    _dists, read = read_package_dir(tmp_path / "cache", site_dir)
+    assert read == ["foo-1.2.3.dist-info"]
+
+
+def test_local_package_resolver__with_cache__returns_same_packages(fake_venv, tmp_path):
+    venv_dir, _site_dir = fake_venv({"foo": {"foo", "bar"}, "Some-Pkg": {"some"}})
+    srcs = pyenv_sources(venv_dir)
+    expect = LocalPackageResolver(srcs).packages
+    assert LocalPackageResolver(srcs, tmp_path / "cache").packages == expect
+    assert LocalPackageResolver(srcs, tmp_path / "cache").packages == expect
+
+
+def fake_install(name, size=100):
+    def install(target):
+        dist_info = target / f"{name}-1.0.dist-info"
+        dist_info.mkdir()
+        (dist_info / "METADATA").write_text(f"Name: {name}\nVersion: 1.0\n")
+        (dist_info / "top_level.txt").write_text(f"{name}_module\n")
+        (target / f"{name}_module.py").write_text("x" * size)
+        return True
+
+    return install
+
+
+def test_installed_requirements_cache__added_entry__is_found_later(tmp_path):
+    cache = InstalledRequirementsCache.in_cache_dir(tmp_path, max_size=10**6)
+    assert cache.lookup("foo") is None
+    entry = cache.add("foo", fake_install("foo"))
+    assert entry is not None
+    assert (entry / "foo_module.py").is_file()
+
+    cache = InstalledRequirementsCache.in_cache_dir(tmp_path, max_size=10**6)
+    assert cache.lookup("foo") == entry
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_installed_requirements_cache__failed_install__is_remembered(tmp_path):
+    cache = InstalledRequirementsCache.in_cache_dir(tmp_path, max_size=10**6)
+    assert not cache.recently_failed("foo")
+    assert cache.add("foo", lambda _target: False) is None
+    assert cache.lookup("foo") is None
+    assert cache.recently_failed("foo")
+    assert not cache.recently_failed("bar")
+
+    # Once expired, the failure is forgotten, and removed by .evict()
+    (failed_path,) = cache.path.iterdir()
+    os.utime(failed_path, (0, 0))
+    assert not cache.recently_failed("foo")
+    cache.evict()
+    assert list(cache.path.iterdir()) == []
+
+
+def test_installed_requirements_cache__evict__removes_stale_temp_dirs(tmp_path):
+    cache = InstalledRequirementsCache.in_cache_dir(tmp_path, max_size=10**6)
+    with cache.temp_dir() as fresh_dir, cache.temp_dir() as stale_dir:
+        (Path(stale_dir) / "foo_module.py").write_text("x")
+        os.utime(stale_dir, (0, 0))
+        cache.evict()
+        assert Path(fresh_dir).is_dir()
+        assert not Path(stale_dir).exists()
+
+
+def test_installed_requirements_cache__too_big__evicts_least_recently_used(
+    tmp_path,
+):
+    cache = InstalledRequirementsCache.in_cache_dir(tmp_path, max_size=2500)
+    entries = {name: cache.add(name, fake_install(name, 1000)) for name in "abc"}
+    for age, name in enumerate(["b", "a", "c"]):  # "c" was used least recently
+        info = next(entries[name].glob(".fawltydeps-*"))
+        os.utime(info, ns=(10**18 - age * 10**9, 10**18 - age * 10**9))
+
+    cache.evict(keep={entries["c"]})
+    assert cache.lookup("a") is None
+    assert cache.lookup("b") == entries["b"]
+    assert cache.lookup("c") == entries["c"]
+
+
+def test_temporary_pip_install_resolver__cached_packages__are_not_installed(
+    tmp_path, monkeypatch
+):
+    cache = InstalledRequirementsCache.in_cache_dir(tmp_path, max_size=10**6)
+    cache.add("foo", fake_install("foo"))
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("should not install anything")
+
+    monkeypatch.setattr("fawltydeps.packages.pip_install", fail)
+    monkeypatch.setattr("fawltydeps.packages.venv.create", fail)
+    resolver = TemporaryPipInstallResolver(tmp_path)
+    assert resolver.lookup_packages({"Foo"}) == {
+        "Foo": Package(
+            "foo",
+            {"foo_module"},
+            TemporaryPipInstallResolver,
+            "Provided by cached `pip install`",
+        ),
+    }
+
+
+def fake_pip_install_target(calls, failing=frozenset()):
+    """Fake `pip install --target` that writes a minimal package per requirement."""
+
+    def pip_install(_venv_dir, args):
+        calls.append(args)
+        _target_opt, target, *requirements = args
+        if failing.intersection(requirements):
+            return subprocess.CompletedProcess(args, 1, stdout="")
+        for name in requirements:
+            dist_info = Path(target, f"{name}-1.0.dist-info")
+            dist_info.mkdir()
+            (dist_info / "METADATA").write_text(f"Name: {name}\nVersion: 1.0\n")
+            (Path(target, f"{name}_module.py")).write_text("x")
+            (dist_info / "RECORD").write_text(
+                f"{name}_module.py,,\n{name}-1.0.dist-info/METADATA,,\n"
+                f"{name}-1.0.dist-info/RECORD,,\n../../bin/{name},,\n"
+            )
+        return subprocess.CompletedProcess(args, 0, stdout="")
+
+    return pip_install
+
+
+def test_temporary_pip_install_resolver__missing_packages__are_installed_together(
+    tmp_path, monkeypatch
+):
+    calls = []
+    monkeypatch.setattr(
+        "fawltydeps.packages.pip_install", fake_pip_install_target(calls)
+    )
+    monkeypatch.setattr("fawltydeps.packages.venv.create", lambda *_a, **_kw: None)
+    resolver = TemporaryPipInstallResolver(tmp_path)
+    assert resolver.lookup_packages({"foo", "bar"}) == {
+        name: Package(
+            name,
+            {f"{name}_module"},
+            TemporaryPipInstallResolver,
+            "Provided by cached `pip install`",
+        )
+        for name in ["foo", "bar"]
+    }
+    assert len(calls) == 1
+
+    # Each package was moved into its own cache entry
+    cache = InstalledRequirementsCache.in_cache_dir(tmp_path, max_size=10**6)
+    for name, other in [("foo", "bar"), ("bar", "foo")]:
+        entry = cache.lookup(name)
+        assert entry is not None
+        assert (entry / f"{name}_module.py").is_file()
+        assert not (entry / f"{other}_module.py").exists()
+    assert not list(cache.path.glob(".tmp-*"))
+
+
+def test_temporary_pip_install_resolver__failed_packages__are_not_retried(
+    tmp_path, monkeypatch, caplog
+):
+    calls = []
+    monkeypatch.setattr(
+        "fawltydeps.packages.pip_install",
+        fake_pip_install_target(calls, failing={"bad"}),
+    )
+    monkeypatch.setattr("fawltydeps.packages.venv.create", lambda *_a, **_kw: None)
+    resolver = TemporaryPipInstallResolver(tmp_path)
+    assert set(resolver.lookup_packages({"foo", "bad", "bar"})) == {"foo", "bar"}
+    assert len(calls) > 1
+
+    calls.clear()
+    resolver = TemporaryPipInstallResolver(tmp_path)
+    assert set(resolver.lookup_packages({"foo", "bad", "bar"})) == {"foo", "bar"}
+    assert calls == []
+    assert "Not installing 'bad', as it recently failed" in caplog.text
+
+
+def test_temporary_pip_install_resolver__failed_install_ttl_0__retries_packages(
+    tmp_path, monkeypatch
+):
+    calls = []
+    monkeypatch.setattr(
+        "fawltydeps.packages.pip_install",
+        fake_pip_install_target(calls, failing={"bad"}),
+    )
+    monkeypatch.setattr("fawltydeps.packages.venv.create", lambda *_a, **_kw: None)
+    resolver = TemporaryPipInstallResolver(tmp_path)
+    assert set(resolver.lookup_packages({"foo", "bad"})) == {"foo"}
+
+    calls.clear()
+    resolver = TemporaryPipInstallResolver(tmp_path, failed_install_ttl=0)
+    assert set(resolver.lookup_packages({"foo", "bad"})) == {"foo"}
+    assert calls == [["--target", calls[0][1], "bad"]]
+
+    # The retry also cleared the recorded failure for later runs
+    calls.clear()
+    resolver = TemporaryPipInstallResolver(tmp_path)
+    assert set(resolver.lookup_packages({"foo", "bad"})) == {"foo"}
+    assert len(calls) == 1
+
+
+def test_temporary_pip_install_resolver__whole_batch_fails__is_not_remembered(
+    tmp_path, monkeypatch
+):
+    names = {f"pkg{i}" for i in range(16)}
+    calls = []
+    monkeypatch.setattr(
+        "fawltydeps.packages.pip_install",
+        fake_pip_install_target(calls, failing=names),
+    )
+    monkeypatch.setattr("fawltydeps.packages.venv.create", lambda *_a, **_kw: None)
+    resolver = TemporaryPipInstallResolver(tmp_path)
+    assert resolver.lookup_packages(names) == {}
+    assert len(calls) <= 1 + len(names) + 6  # not one per bisection step
+
+    calls.clear()
+    monkeypatch.setattr(
+        "fawltydeps.packages.pip_install", fake_pip_install_target(calls)
+    )
+    resolver = TemporaryPipInstallResolver(tmp_path)
+    assert set(resolver.lookup_packages(names)) == names
+    assert len(calls) == 1
+
+
+def test_compiled_mapping__lookup__returns_only_requested_entries(tmp_path):
+    mapping_path = tmp_path / "mapping.toml"
+    mapping_path.write_text(
+        "\n".join(f'pkg-{i} = ["import_{i}"]' for i in range(2000))
+        + '\nPkg_7 = ["other"]\n'
+    )
+    loaded = []
+
+    def load(path):
+        loaded.append(path)
+        return UserDefinedMapping._load_mapping_file(path)  # noqa: SLF001
+
+    compiled = CompiledMapping.for_mapping_file(tmp_path / "cache", mapping_path)
+    keys = {f"pkg_{i}" for i in range(0, 2000, 7)}
+    actual = compiled.lookup(keys, load, Package.normalize_name)
+    assert len(actual) == len(keys) + 1
+    assert actual["pkg-7"] == ["import_7"]
+    assert actual["Pkg_7"] == ["other"]
+    assert list(actual)[:3] == ["pkg-0", "pkg-7", "pkg-14"]  # file order
+    assert loaded == [mapping_path]
+
+    # Compiled database is reused, as long as the mapping file is unchanged
+    compiled = CompiledMapping.for_mapping_file(tmp_path / "cache", mapping_path)
+    assert compiled.lookup({"pkg_1"}, load, Package.normalize_name) == {
+        "pkg-1": ["import_1"]
+    }
+    assert loaded == [mapping_path]
+
+
+def test_compiled_mapping__modified_mapping_file__is_compiled_again(tmp_path):
+    mapping_path = tmp_path / "mapping.toml"
+    mapping_path.write_text('foo = ["foo"]\n')
+    load = UserDefinedMapping._load_mapping_file  # noqa: SLF001
+    compiled = CompiledMapping.for_mapping_file(tmp_path / "cache", mapping_path)
+    assert compiled.lookup({"foo"}, load, Package.normalize_name) == {"foo": ["foo"]}
+
+    mapping_path.write_text('foo = ["bar", "baz"]\n')
+    assert compiled.lookup({"foo"}, load, Package.normalize_name) == {
+        "foo": ["bar", "baz"]
+    }
+
+
+def test_compiled_mapping__missing_database__is_not_created_by_check(tmp_path):
+    mapping_path = tmp_path / "mapping.toml"
+    mapping_path.write_text('foo = ["foo"]\n')
+    (tmp_path / "cache").mkdir()
+    compiled = CompiledMapping.for_mapping_file(tmp_path / "cache", mapping_path)
+    assert not compiled._is_fresh(compiled._source())  # noqa: SLF001
+    assert not compiled.path.exists()
+
+
+def test_user_defined_mapping__with_cache__returns_same_packages(tmp_path):
+    mapping_paths = set()
+    for i, content in enumerate(
+        ['apache-airflow = ["airflow"]\nattrs = ["attr", "attrs"]\n', 'Attrs = ["x"]']
+    ):
+        mapping_paths.add(tmp_path / f"mapping{i}.toml")
+        (tmp_path / f"mapping{i}.toml").write_text(content)
+    custom_mapping = {"apache_airflow": ["unicorn"], "foo": ["bar"]}
+    deps = {"apache-airflow", "attrs", "foo", "missing"}
+
+    expect = UserDefinedMapping(mapping_paths, custom_mapping).lookup_packages(deps)
+    for _ in range(2):
+        udm = UserDefinedMapping(mapping_paths, custom_mapping, tmp_path / "cache")
+        assert udm.lookup_packages(deps) == expect
@@ -57,6 +57,13 @@ def make_json_settings_dict(**kwargs):
         "exclude_from": [],
         "verbosity": 0,
         "custom_mapping_file": [],
+        "jobs": 1,
+        "cache_dir": None,
+        "max_install_cache_size": 1024,
+        "failed_install_ttl": 24,
+        "wheelhouse": None,
+        "use_isort": False,
+        "use_git_index": False,
     }
     assert all(k in settings for k in kwargs)
     settings.update(kwargs)
@@ -1242,6 +1249,13 @@ def test_cmdline_on_ignored_undeclared_option(
                 # exclude_from = []
                 # verbosity = 0
                 # custom_mapping_file = []
+                # jobs = 1
+                # cache_dir = ...
+                # max_install_cache_size = 1024
+                # failed_install_ttl = 24
+                # wheelhouse = ...
+                # use_isort = false
+                # use_git_index = false
                 # [tool.fawltydeps.custom_mapping]
                 """
             ).splitlines(),
@@ -1268,6 +1282,13 @@ def test_cmdline_on_ignored_undeclared_option(
                 # exclude_from = []
                 # verbosity = 0
                 # custom_mapping_file = []
+                # jobs = 1
+                # cache_dir = ...
+                # max_install_cache_size = 1024
+                # failed_install_ttl = 24
+                # wheelhouse = ...
+                # use_isort = false
+                # use_git_index = false
                 # [tool.fawltydeps.custom_mapping]
                 """
             ).splitlines(),
@@ -1294,6 +1315,13 @@ def test_cmdline_on_ignored_undeclared_option(
                 # exclude_from = []
                 # verbosity = 0
                 # custom_mapping_file = []
+                # jobs = 1
+                # cache_dir = ...
+                # max_install_cache_size = 1024
+                # failed_install_ttl = 24
+                # wheelhouse = ...
+                # use_isort = false
+                # use_git_index = false
                 # [tool.fawltydeps.custom_mapping]
                 """
             ).splitlines(),
@@ -1320,6 +1348,13 @@ def test_cmdline_on_ignored_undeclared_option(
                 # exclude_from = []
                 # verbosity = 0
                 # custom_mapping_file = []
+                # jobs = 1
+                # cache_dir = ...
+                # max_install_cache_size = 1024
+                # failed_install_ttl = 24
+                # wheelhouse = ...
+                # use_isort = false
+                # use_git_index = false
                 # [tool.fawltydeps.custom_mapping]
                 """
             ).splitlines(),
@@ -1346,6 +1381,13 @@ def test_cmdline_on_ignored_undeclared_option(
                 exclude_from = ['my_ignore']
                 # verbosity = 0
                 # custom_mapping_file = []
+                # jobs = 1
+                # cache_dir = ...
+                # max_install_cache_size = 1024
+                # failed_install_ttl = 24
+                # wheelhouse = ...
+                # use_isort = false
+                # use_git_index = false
                 # [tool.fawltydeps.custom_mapping]
                 """
             ).splitlines(),
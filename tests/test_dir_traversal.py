@@ -1,7 +1,9 @@
 """Test core functionality of DirectoryTraversal class."""
 
+import os
 import sys
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
 from textwrap import dedent
@@ -9,7 +11,7 @@ from typing import Generic, List, Optional, Tuple, Type, TypeVar, Union
 
 import pytest
 
-from fawltydeps.dir_traversal import DirectoryTraversal, TraversalStep
+from fawltydeps.dir_traversal import DirectoryTraversal, MountTable, TraversalStep
 from fawltydeps.gitignore_parser import RuleError, RuleMissing
 
 from .utils import assert_unordered_equivalence
@@ -1047,7 +1049,179 @@ def test_DirectoryTraversal_w_rel_paths(
     vector.verify_traversal(traversal, Path())
 
 
+@pytest.mark.parametrize(
+    "vector", [pytest.param(v, id=v.id) for v in directory_traversal_vectors]
+)
+def test_DirectoryTraversal_w_jobs(vector: DirectoryTraversalVector, tmp_path):
+    traversal = vector.setup(tmp_path)
+    traversal.jobs = 4
+    vector.verify_traversal(traversal, tmp_path)
+
+
+def test_DirectoryTraversal_w_jobs__yields_steps_in_serial_order(tmp_path):
+    for i in range(10):
+        for j in range(10):
+            (tmp_path / f"dir{i}" / f"sub{j}").mkdir(parents=True)
+    (tmp_path / "dir3" / "sub3" / "loop").symlink_to(tmp_path)
+
+    def walk(jobs: int) -> List[Path]:
+        traversal: DirectoryTraversal = DirectoryTraversal(jobs=jobs)
+        traversal.add(tmp_path)
+        visited = []
+        for step in traversal.traverse():
+            visited.append(step.dir)
+            for subdir in step.subdirs:
+                if subdir.name in {"dir5", "sub7"}:
+                    traversal.skip_dir(subdir)  # skip while walking
+        return visited
+
+    serial = walk(jobs=1)
+    assert len(serial) == 1 + 9 * 10  # dir5 and all sub7 dirs skipped
+    assert walk(jobs=4) == serial
+
+
 def test_DirectoryTraversal__raises_error__when_adding_missing_dir(tmp_path):
     traversal = DirectoryTraversal()
     with pytest.raises(NotADirectoryError):
         traversal.add(tmp_path / "MISSING")
+
+
+class StatCountingEntry:
+    """Wrap an os.DirEntry, and record the paths of all .stat() calls."""
+
+    def __init__(self, entry, stat_calls):
+        self._entry = entry
+        self._stat_calls = stat_calls
+        self.name = entry.name
+
+    def __getattr__(self, attr):
+        return getattr(self._entry, attr)
+
+    def stat(self, **kwargs):
+        self._stat_calls.append(Path(self._entry.path))
+        return self._entry.stat(**kwargs)
+
+
+@pytest.fixture()
+def count_stat_calls(monkeypatch):
+    """Return the list of paths that DirEntry.stat() is called on."""
+    stat_calls: List[Path] = []
+    real_scandir = os.scandir
+
+    @contextmanager
+    def scandir(path):
+        with real_scandir(path) as entries:
+            yield (StatCountingEntry(entry, stat_calls) for entry in entries)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+    return stat_calls
+
+
+def use_mount_table(monkeypatch, mount_names, btrfs_devs=frozenset()):
+    mounts = MountTable(mount_names, frozenset(btrfs_devs))
+    monkeypatch.setattr(MountTable, "read", lambda *_args: mounts)
+
+
+def test_DirectoryTraversal__does_not_stat_plain_subdirs(
+    tmp_path, monkeypatch, count_stat_calls
+):
+    (tmp_path / "a" / "b" / "c").mkdir(parents=True)
+    (tmp_path / "a" / "d").mkdir()
+    (tmp_path / "a" / "b" / "file").touch()
+    (tmp_path / "a" / "b" / "c" / "loop").symlink_to(tmp_path / "a")
+    use_mount_table(monkeypatch, {tmp_path.stat().st_dev: frozenset()})
+
+    traversal: DirectoryTraversal = DirectoryTraversal()
+    traversal.add(tmp_path / "a")
+    steps = list(traversal.traverse())
+    # The symlink back to "a" is detected as a loop, and not traversed
+    assert sorted(step.dir for step in steps) == [
+        tmp_path / "a" / subdir for subdir in ["", "b", "b/c", "d"]
+    ]
+    assert count_stat_calls == [tmp_path / "a" / "b" / "c" / "loop"]
+
+
+@pytest.mark.parametrize(
+    ("mount_names", "btrfs", "expect_stat"),
+    [
+        pytest.param({"b"}, False, ["b"], id="mount_point_name"),
+        pytest.param(set(), True, [], id="btrfs_non_subvolume"),
+        pytest.param(None, False, ["b", "d"], id="unknown_device"),
+    ],
+)
+def test_DirectoryTraversal__stats_subdirs_that_may_change_device(
+    tmp_path, monkeypatch, count_stat_calls, mount_names, btrfs, expect_stat
+):
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "a" / "d").mkdir()
+    dev = tmp_path.stat().st_dev
+    use_mount_table(
+        monkeypatch,
+        {} if mount_names is None else {dev: frozenset(mount_names)},
+        {dev} if btrfs else set(),
+    )
+
+    traversal: DirectoryTraversal = DirectoryTraversal()
+    traversal.add(tmp_path / "a")
+    assert len(list(traversal.traverse())) == 3  # noqa: PLR2004
+    assert sorted(count_stat_calls) == [tmp_path / "a" / name for name in expect_stat]
+
+
+def test_DirectoryTraversal__without_mount_table__stats_all_subdirs(
+    tmp_path, monkeypatch, count_stat_calls
+):
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    monkeypatch.setattr(MountTable, "read", lambda *_args: None)
+
+    traversal: DirectoryTraversal = DirectoryTraversal()
+    traversal.add(tmp_path / "a")
+    assert [step.dir for step in traversal.traverse()] == [
+        tmp_path / "a",
+        tmp_path / "a" / "b",
+    ]
+    assert count_stat_calls == [tmp_path / "a" / "b"]
+
+
+def test_MountTable_read__finds_mount_point_names_per_device(tmp_path):
+    mountinfo = tmp_path / "mountinfo"
+    mountinfo.write_text(
+        dedent(
+            """\
+            1 0 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw
+            2 1 0:5 / /dev rw,nosuid - devtmpfs devtmpfs rw
+            3 2 0:6 / /dev/pts rw - devpts devpts rw
+            4 1 0:7 / /home/my\\040files rw - btrfs /dev/sdb1 rw
+            5 1 0:8 / /var/lib/docker/overlay rw - overlay overlay rw
+            """
+        )
+    )
+    mounts = MountTable.read(mountinfo)
+    assert mounts == MountTable(
+        mount_names={
+            os.makedev(8, 1): frozenset(["dev", "my files", "overlay"]),
+            os.makedev(0, 5): frozenset(["pts"]),
+            os.makedev(0, 6): frozenset(),
+            os.makedev(0, 7): frozenset(),
+        },
+        btrfs_devs=frozenset([os.makedev(0, 7)]),
+    )
+    assert MountTable.read(tmp_path / "missing") is None
+
+
+def test_DirectoryTraversal__passes_attached_data_down_deep_tree(tmp_path):
+    depth = 200
+    deepest = tmp_path.joinpath(*(f"d{i}" for i in range(depth)))
+    deepest.mkdir(parents=True)
+    middle = deepest.parents[depth // 2 - 1]
+
+    traversal: DirectoryTraversal = DirectoryTraversal()
+    traversal.add(tmp_path, "top")
+    traversal.add(middle, "middle", "more")
+
+    steps = list(traversal.traverse())
+    assert len(steps) == depth + 1
+    for step in steps:
+        if step.dir == middle or middle in step.dir.parents:
+            assert step.attached == ["top", "middle", "more"]
+        else:
+            assert step.attached == ["top"]
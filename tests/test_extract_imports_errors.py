@@ -30,6 +30,15 @@ def test_parse_notebook_file__on_invalid_json__logs_error(tmp_path, caplog):
     assert f"Could not parse code from {script}" in caplog.text
 
 
+def test_parse_notebook_file__on_invalid_utf8__logs_error(tmp_path, caplog):
+    script = tmp_path / "test.ipynb"
+    script.write_bytes(b'{"cells": [], "metadata": {"name": "\xff"}}')
+    expected = []
+    caplog.set_level(logging.ERROR)
+    assert list(parse_notebook_file(script)) == expected
+    assert f"Could not parse code from {script}" in caplog.text
+
+
 def test_parse_notebook_file__on_parse_error_one_cell__logs_error_and_continues(
     tmp_path, caplog
 ):
@@ -1,15 +1,19 @@
 """Test that we can extract simple imports from Python code."""
 
+import ast
 import json
 import logging
+import sys
 from io import BytesIO
 from pathlib import Path
 from textwrap import dedent
 from typing import Dict, List, Tuple, Union
 
+import isort
 import pytest
 
 from fawltydeps.extract_imports import (
+    iter_import_nodes,
     parse_code,
     parse_notebook_file,
     parse_python_file,
@@ -261,6 +265,95 @@ def test_parse_python_file__legacy_encoding__extracts_import(tmp_path):
     assert list(parse_python_file(script)) == expect
 
 
+NESTED_IMPORTS_CODE = """\
+import a
+if x:
+    import b
+    def f():
+        import c
+        try:
+            import d
+        except (ImportError, ValueError) as e:
+            import e
+        else:
+            import f
+        finally:
+            import g
+elif y:
+    import h
+else:
+    for i in range(10):
+        import i
+    else:
+        import j
+class K:
+    import k
+    async def l(self):
+        async with m() as n:
+            import l
+        while True:
+            import m
+        lambda: __import__("n")
+from o import p
+with q:
+    from r import s
+"""
+
+
+def test_iter_import_nodes__nested_statements__same_order_as_ast_walk():
+    tree = ast.parse(NESTED_IMPORTS_CODE)
+    expect = [
+        node
+        for node in ast.walk(tree)
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+    assert list(iter_import_nodes(tree)) == expect
+    assert len(expect) == NESTED_IMPORTS_CODE.count("import ")
+
+
+@pytest.mark.skipif(
+    sys.version_info < (3, 10), reason="match statements require Python v3.10+"
+)
+def test_iter_import_nodes__match_statement__same_order_as_ast_walk():
+    code = dedent(
+        """\
+        match x:
+            case 1:
+                import a
+            case [y, *_] if y:
+                import b
+            case _:
+                import c
+        import d
+        """
+    )
+    tree = ast.parse(code)
+    expect = [
+        node
+        for node in ast.walk(tree)
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+    assert list(iter_import_nodes(tree)) == expect
+    assert len(expect) == code.count("import ")
+
+
+def test_parse_code__debug_logging_disabled__does_not_dump_ast(monkeypatch, caplog):
+    def fail_dump(*_args, **_kwargs):
+        raise AssertionError("ast.dump() should not be called")
+
+    monkeypatch.setattr(ast, "dump", fail_dump)
+    caplog.set_level(logging.INFO)
+    source = Location("<stdin>")
+    expect = [ParsedImport("numpy", source.supply(lineno=1))]
+    assert list(parse_code("import numpy", source=source)) == expect
+
+
+def test_parse_code__debug_logging_enabled__dumps_ast(caplog):
+    caplog.set_level(logging.DEBUG)
+    list(parse_code("import numpy", source=Location("<stdin>")))
+    assert "Import(names=[alias(name='numpy'" in caplog.text
+
+
 def test_parse_notebook_file__simple_imports__extracts_all(tmp_path):
     code = generate_notebook([["import pandas\n", "import pytorch"]])
     script = tmp_path / "test.ipynb"
@@ -492,6 +585,76 @@ def test_parse_sources__imports__are_extracted_in_order_of_encounter(
     assert list(parse_sources(code_sources)) == expect
 
 
+def test_parse_sources__with_multiple_jobs__yields_same_imports_in_same_order(
+    write_code_sources,
+):
+    _tmp_path, code_sources = write_code_sources(
+        {
+            **{f"mod{i}.py": f"import foo{i}\nimport bar{i}\n" for i in range(20)},
+            "notebook.ipynb": generate_notebook([["import pandas"], ["import numpy"]]),
+            "sub/mod.py": "from my_pathlib import Path",
+        }
+    )
+    stdin_source = CodeSource("<stdin>")
+    code_sources.insert(10, stdin_source)
+
+    def parse(jobs):
+        return list(parse_sources(code_sources, BytesIO(b"import xyzzy"), jobs=jobs))
+
+    expect = parse(jobs=1)
+    assert len(expect) == 20 * 2 + 2 + 1 + 1
+    assert parse(jobs=3) == expect
+
+
+def test_parse_sources__same_names_in_many_files__are_classified_once(
+    write_code_sources, monkeypatch
+):
+    tmp_path, code_sources = write_code_sources(
+        {f"mod{i}.py": "import numpy\nimport os\n" for i in range(5)}
+    )
+    place_module_calls = []
+    orig_place_module = isort.place_module
+
+    def counting_place_module(name, config):
+        place_module_calls.append(name)
+        return orig_place_module(name, config=config)
+
+    monkeypatch.setattr(isort, "place_module", counting_place_module)
+    expect = [
+        ParsedImport("numpy", Location(tmp_path / f"mod{i}.py", lineno=1))
+        for i in range(5)
+    ]
+    assert list(parse_sources(code_sources, use_isort=True)) == expect
+    assert sorted(place_module_calls) == ["numpy", "os"]
+
+
+def test_parse_sources__files_in_same_dir__share_isort_config(
+    write_code_sources, monkeypatch
+):
+    tmp_path, code_sources = write_code_sources(
+        {
+            "a.py": "import numpy",
+            "b.py": "import numpy",
+            "sub/c.py": "import numpy",
+            "sub/d.py": "import numpy",
+            "sub/e.py": "import numpy",
+        }
+    )
+    configs = []
+    orig_config = isort.Config
+
+    def counting_config(**kwargs):
+        configs.append(kwargs["src_paths"])
+        return orig_config(**kwargs)
+
+    monkeypatch.setattr(isort, "Config", counting_config)
+    assert len(list(parse_sources(code_sources, use_isort=True))) == len(code_sources)
+    assert configs == [
+        (tmp_path, tmp_path),
+        (tmp_path, tmp_path / "sub", tmp_path),
+    ]
+
+
 @pytest.mark.parametrize(
     ("code", "expect_data"),
     [
@@ -1,12 +1,14 @@
 """Verify behavior of gitignore_parser."""
 
+import random
 import sys
+import time
 from pathlib import Path
 from typing import List, NamedTuple, Union
 
 import pytest
 
-from fawltydeps.gitignore_parser import match_rules, parse_gitignore_lines
+from fawltydeps.gitignore_parser import RuleSet, match_rules, parse_gitignore_lines
 
 PathOrStr = Union[str, Path]
 
@@ -249,3 +251,113 @@ def test_symlink_to_another_directory(tmp_path):
     # Verify behavior according to https://git-scm.com/docs/gitignore#_notes:
     # Symlinks are not followed and are matched as if they were regular files.
     assert match_rules(rules, link, is_dir=False)
+
+
+def _rule_set_vector_params():
+    for vector in test_vectors:
+        paths = [*vector.does_match, *vector.doesnt_match]
+        for base_dir in [Path(vector.base_dir), Path(vector.base_dir).absolute()]:
+            # Use a trailing '/' in the test vectors to signal is_dir=True.
+            cases = [
+                (base_dir / path, isinstance(path, str) and path.endswith("/"))
+                for path in paths
+            ]
+            yield pytest.param(
+                vector.patterns,
+                base_dir,
+                cases,
+                id=f"{vector.id}-{'abs' if base_dir.is_absolute() else 'rel'}",
+            )
+
+
+@pytest.mark.parametrize(
+    ("patterns", "base_dir", "cases"), list(_rule_set_vector_params())
+)
+def test_rule_set__matches_same_as_match_rules(patterns, base_dir, cases):
+    rules = list(parse_gitignore_lines(patterns, base_dir, base_dir / ".gitignore"))
+    rule_set = RuleSet(rules)
+    for path, is_dir in cases:
+        for path_is_dir in [is_dir, not is_dir]:
+            expect = match_rules(rules, path, is_dir=path_is_dir)
+            assert rule_set.match(path, is_dir=path_is_dir) == expect, (path, is_dir)
+
+
+def _generate_rules_and_paths(num_patterns: int, num_paths: int, seed: int = 0):
+    """Generate a mix of gitignore patterns and paths to match against them."""
+    rng = random.Random(seed)  # noqa: S311
+    names = ["build", "dist", "foo", "bar.py", "x.pyc", "data", "a b", "[odd]"]
+    exts = [".py", ".pyc", ".log", ".txt", ".tmp", ""]
+    templates = [
+        "{name}",
+        "{name}/",
+        "/{name}",
+        "*{ext}",
+        "{name}*",
+        "**/{name}/{name}",
+        "{name}/**/*{ext}",
+        "{name}/{name}",
+        "[bf]?o*",
+        "!{name}",
+        "!*{ext}",
+        "!{name}/",
+    ]
+    patterns = [
+        rng.choice(templates).format(
+            name=rng.choice(names) + rng.choice(["", str(rng.randrange(50))]),
+            ext=rng.choice(exts),
+        )
+        for _ in range(num_patterns)
+    ]
+    paths = [
+        (
+            Path(
+                *(
+                    rng.choice(names) + rng.choice(exts)
+                    for _ in range(rng.randrange(1, 5))
+                )
+            ),
+            rng.random() < 0.3,  # noqa: PLR2004
+        )
+        for _ in range(num_paths)
+    ]
+    return patterns, paths
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rule_set__random_rules_and_paths__matches_same_as_match_rules(seed):
+    patterns, paths = _generate_rules_and_paths(200, 500, seed)
+    base_dir = Path("/some/dir")
+    rules = list(parse_gitignore_lines(patterns, base_dir))
+    rules += list(parse_gitignore_lines(["*.py", "!foo*", "data/"]))  # no base_dir
+    rule_set = RuleSet(rules)
+    for rel_path, is_dir in paths:
+        for path in [base_dir / rel_path, Path("elsewhere") / rel_path]:
+            expect = match_rules(rules, path, is_dir=is_dir)
+            assert rule_set.match(path, is_dir=is_dir) == expect, (path, is_dir)
+
+
+@pytest.mark.integration()
+def test_rule_set__benchmark_against_match_rules(capsys):
+    # A big .gitignore (400 rules), matched against a number of paths
+    patterns, paths = _generate_rules_and_paths(400, 2000)
+    base_dir = Path("/some/dir")
+    rules = list(parse_gitignore_lines(patterns, base_dir))
+    paths = [(base_dir / path, is_dir) for path, is_dir in paths]
+
+    start = time.perf_counter()
+    expect = [match_rules(rules, path, is_dir=is_dir) for path, is_dir in paths]
+    reference = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rule_set = RuleSet(rules)
+    actual = [rule_set.match(path, is_dir=is_dir) for path, is_dir in paths]
+    compiled = time.perf_counter() - start
+
+    assert actual == expect
+    with capsys.disabled():
+        print(
+            f"\nMatching {len(paths)} paths against {len(rules)} rules:"
+            f" match_rules(): {reference:.3f}s, RuleSet: {compiled:.3f}s"
+            f" ({reference / compiled:.1f}x faster)"
+        )
+    assert compiled < reference
@@ -1,6 +1,7 @@
 """Verify behavior of TemporaryPipInstallResolver."""
 
 import logging
+import subprocess
 
 import pytest
 
@@ -8,6 +9,7 @@ from fawltydeps.packages import (
     Package,
     TemporaryPipInstallResolver,
     resolve_dependencies,
+    retry_pip_install,
     setup_resolvers,
 )
 from fawltydeps.types import UnresolvedDependenciesError
@@ -75,3 +77,48 @@ def test_resolve_dependencies_install_deps_on_mixed_packages__raises_unresolved_
         f"Trying to resolve {deps!r} with <fawltydeps.packages.TemporaryPipInstallResolver"
         in caplog.text
     )
+
+
+def test_retry_pip_install__isolates_failing_requirements(
+    caplog, monkeypatch, tmp_path
+):
+    caplog.set_level(logging.WARNING)
+    requirements = [f"req{i}" for i in range(64)]
+    calls = []
+    installed = set()
+
+    def fake_pip_install(_venv_dir, args):
+        calls.append(args)
+        if {"req13", "req42"}.intersection(args):
+            return subprocess.CompletedProcess(args, 1, stdout="")
+        installed.update(args)
+        return subprocess.CompletedProcess(args, 0, stdout="")
+
+    monkeypatch.setattr("fawltydeps.packages.pip_install", fake_pip_install)
+    retry_pip_install(tmp_path, requirements)
+
+    assert installed == set(requirements) - {"req13", "req42"}
+    assert len(calls) < 30  # noqa: PLR2004
+    assert "Failed to install 'req13'" in caplog.text
+    assert "Failed to install 'req42'" in caplog.text
+    assert caplog.text.count("Failed to install") == 2  # noqa: PLR2004
+
+
+def test_retry_pip_install__all_failing__retries_each_requirement_once(
+    caplog, monkeypatch, tmp_path
+):
+    caplog.set_level(logging.WARNING)
+    requirements = [f"req{i}" for i in range(64)]
+    calls = []
+
+    def fake_pip_install(_venv_dir, args):
+        calls.append(args)
+        return subprocess.CompletedProcess(args, 1, stdout="")
+
+    monkeypatch.setattr("fawltydeps.packages.pip_install", fake_pip_install)
+    retry_pip_install(tmp_path, requirements)
+
+    assert len(calls) <= len(requirements) + 6
+    assert [args for args in calls if len(args) == 1] == [[r] for r in requirements]
+    for req in requirements:
+        assert f"Failed to install {req!r}" in caplog.text
@@ -7,6 +7,7 @@ from typing import Iterator
 
 import pytest
 
+from fawltydeps import packages
 from fawltydeps.packages import (
     IdentityMapping,
     LocalPackageResolver,
@@ -207,6 +208,31 @@ def test_sys_path_env__prefers_first_package_found(isolate_default_resolver):
     }
 
 
+@pytest.mark.parametrize("cache_dir", [None, "cache"])
+def test_sys_path_env__finds_package_in_unpacked_egg(
+    isolate_default_resolver, tmp_path, monkeypatch, cache_dir
+):
+    site_dir = isolate_default_resolver({})
+    egg_dir = site_dir / "Egg_Pkg-1.0-py3.7.egg"
+    (egg_dir / "EGG-INFO").mkdir(parents=True)
+    (egg_dir / "EGG-INFO" / "PKG-INFO").write_text("Name: Egg-Pkg\nVersion: 1.0\n")
+    (egg_dir / "EGG-INFO" / "top_level.txt").write_text("egg_module\n")
+    (egg_dir / "egg_module.py").touch()
+    monkeypatch.syspath_prepend(egg_dir)
+
+    resolver = SysPathPackageResolver(
+        cache_dir=None if cache_dir is None else tmp_path / cache_dir
+    )
+    expect = Package(
+        "egg_pkg",
+        {"egg_module"},
+        SysPathPackageResolver,
+        {str(egg_dir): {"egg_module"}},
+    )
+    assert resolver.lookup_packages({"egg-pkg"}) == {"egg-pkg": expect}
+    assert resolver.packages["egg_pkg"] == expect
+
+
 def test_local_env__multiple_pyenvs__can_find_packages_in_all(fake_venv):
     venv_dir1, site_dir1 = fake_venv({"some_module": {"some_module"}})
     venv_dir2, site_dir2 = fake_venv({"other-module": {"other_module"}})
@@ -244,6 +270,91 @@ def test_local_env__multiple_pyenvs__merges_imports_for_same_package(fake_venv):
     }
 
 
+def test_local_env__lookup_packages__reads_only_matching_packages(
+    fake_venv, monkeypatch
+):
+    venv_dir, site_dir = fake_venv(
+        {"Some_Module": {"some_module"}, "other_module": {"other_module"}}
+    )
+    lpl = LocalPackageResolver(pyenv_sources(venv_dir))
+    read_paths = []
+    real_read_dist_details = packages.read_dist_details
+
+    def recording_read_dist_details(dist_path):
+        read_paths.append(dist_path)
+        return real_read_dist_details(dist_path)
+
+    monkeypatch.setattr(packages, "read_dist_details", recording_read_dist_details)
+    assert lpl.lookup_packages({"some-module"}) == {
+        "some-module": Package(
+            "some_module",
+            {"some_module"},
+            LocalPackageResolver,
+            {str(site_dir): {"some_module"}},
+        ),
+    }
+    assert read_paths == [site_dir / "Some_Module-1.2.3.dist-info"]
+    assert lpl._packages is None  # noqa: SLF001
+
+
+def test_local_env__lookup_packages__remembers_missing_packages(fake_venv, monkeypatch):
+    venv_dir, site_dir = fake_venv({"some_module": {"some_module"}})
+    # Metadata entry whose name does not match the (valid) package name inside
+    dist_info_dir = site_dir / "unexpected_name-1.0.dist-info"
+    dist_info_dir.mkdir()
+    (dist_info_dir / "METADATA").write_text("Name: other_module\nVersion: 1.0\n")
+    lpl = LocalPackageResolver(pyenv_sources(venv_dir))
+    assert lpl.lookup_packages({"other_module"}) == {}
+    assert lpl._packages is None  # noqa: SLF001
+
+    def fail_find_dist_paths(_package_dir):
+        raise AssertionError("find_dist_paths() should not be called")
+
+    monkeypatch.setattr(packages, "find_dist_paths", fail_find_dist_paths)
+    assert lpl.lookup_packages({"other-module"}) == {}
+
+
+def test_local_env__lookup_packages__falls_back_to_enumerating_all(fake_venv):
+    venv_dir, site_dir = fake_venv({"some_module": {"some_module"}})
+    # Metadata entry for an invalid project name, escaped in some unknown way
+    dist_info_dir = site_dir / "other_module-1.0.dist-info"
+    dist_info_dir.mkdir()
+    (dist_info_dir / "METADATA").write_text("Name: other+module\nVersion: 1.0\n")
+    (dist_info_dir / "top_level.txt").write_text("other_module\n")
+    lpl = LocalPackageResolver(pyenv_sources(venv_dir))
+    assert lpl.lookup_packages({"some_module", "other+module"}) == {
+        "some_module": Package(
+            "some_module",
+            {"some_module"},
+            LocalPackageResolver,
+            {str(site_dir): {"some_module"}},
+        ),
+        "other+module": Package(
+            "other+module",
+            {"other_module"},
+            LocalPackageResolver,
+            {str(site_dir): {"other_module"}},
+        ),
+    }
+    assert lpl._packages is not None  # noqa: SLF001
+
+
+def test_local_env__multiple_pyenvs_with_jobs__matches_serial_enumeration(
+    fake_venv,
+):
+    venv_dirs = [
+        fake_venv({"some_module": {f"import_{i}"}, f"module_{i}": {f"module_{i}"}})[0]
+        for i in range(5)
+    ]
+    srcs = pyenv_sources(*venv_dirs)
+    expect = LocalPackageResolver(srcs).packages
+    actual = LocalPackageResolver(srcs, jobs=3).packages
+    assert actual == expect
+    assert list(actual["some_module"].debug_info) == list(
+        expect["some_module"].debug_info
+    )
+
+
 def test_resolve_dependencies__in_empty_venv__reverts_to_id_mapping(tmp_path):
     venv.create(tmp_path, with_pip=False)
     id_mapping = IdentityMapping()
@@ -0,0 +1,87 @@
+"""Test the incremental reading of Jupyter notebooks."""
+
+import io
+import json
+
+import pytest
+
+from fawltydeps.notebooks import NotebookReader, open_notebook, read_notebook
+
+NOTEBOOK = {
+    "cells": [
+        {
+            "cell_type": "code",
+            "execution_count": 1,
+            "metadata": {"tags": ["[not", "a", "list]"]},
+            "outputs": [
+                {
+                    "data": {
+                        "image/png": "iVBORw0KGgo" * 100,
+                        "text/plain": ['"quoted" \\ back\\"slash {[', "]}\\"],
+                    },
+                    "output_type": "display_data",
+                },
+                {"output_type": "stream", "text": ["æøå\n", None, 1.5e3]},
+            ],
+            "source": ["import numpy\n", 'print("}] \\" \\\\")\n', "import pandas"],
+        },
+        {"cell_type": "markdown", "metadata": {}, "source": ["# import nothing"]},
+        {"cell_type": "code", "outputs": [], "source": "import sys\n"},
+        {"cell_type": "raw", "attachments": {"x.png": {"image/png": "AAAA"}}},
+    ],
+    "metadata": {
+        "kernelspec": {"display_name": "Python 3", "name": "python3"},
+        "language_info": {"name": "python", "version": "3.11.0"},
+        "widgets": {"state": {"abc": {"model": [1, 2, {"3": [4]}]}}},
+    },
+    "nbformat": 4,
+    "nbformat_minor": 5,
+}
+
+EXPECT = {
+    "cells": [
+        {
+            "cell_type": "code",
+            "source": ["import numpy\n", 'print("}] \\" \\\\")\n', "import pandas"],
+        },
+        {"cell_type": "markdown", "source": ["# import nothing"]},
+        {"cell_type": "code", "source": "import sys\n"},
+        {"cell_type": "raw"},
+    ],
+    "metadata": {"language_info": {"name": "python", "version": "3.11.0"}},
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64 * 1024])
+@pytest.mark.parametrize("indent", [None, 1])
+def test_read_notebook__skips_uninteresting_parts(monkeypatch, chunk_size, indent):
+    monkeypatch.setattr(NotebookReader, "CHUNK_SIZE", chunk_size)
+    text = json.dumps(NOTEBOOK, indent=indent, ensure_ascii=False)
+    assert read_notebook(io.StringIO(text)) == EXPECT
+
+
+@pytest.mark.parametrize(
+    "encoding", ["utf-8", "utf-8-sig", "utf-16", "utf-16-le", "utf-32", "utf-32-be"]
+)
+def test_open_notebook__detects_json_encoding(tmp_path, encoding):
+    path = tmp_path / "test.ipynb"
+    path.write_text(json.dumps(NOTEBOOK, ensure_ascii=False), encoding=encoding)
+    with open_notebook(path) as notebook:
+        assert read_notebook(notebook) == EXPECT
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        pytest.param("", id="empty"),
+        pytest.param("[]", id="not_an_object"),
+        pytest.param('{"cells": [{"cell_type": "code",}]}', id="trailing_comma"),
+        pytest.param('{"cells": [], "outputs": ["abc]}', id="unterminated_string"),
+        pytest.param('{"cells": [], "outputs": [[]}', id="unterminated_array"),
+        pytest.param('{"cells": [{"source": tru}]}', id="invalid_scalar"),
+        pytest.param('{"cells": []} {}', id="extra_data"),
+    ],
+)
+def test_read_notebook__invalid_json__raises_error(text):
+    with pytest.raises(json.JSONDecodeError):
+        read_notebook(io.StringIO(text))
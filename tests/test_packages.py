@@ -1,9 +1,13 @@
 """Verify behavior of package lookup and mapping to import names."""
 
 import logging
+import sys
+import zipfile
+from pathlib import Path
 from textwrap import dedent
 
 import pytest
+from importlib_metadata import PathDistribution
 
 from fawltydeps.packages import (
     IdentityMapping,
@@ -11,6 +15,12 @@ from fawltydeps.packages import (
     Package,
     SysPathPackageResolver,
     UserDefinedMapping,
+    WheelhouseResolver,
+    accumulate_mappings,
+    find_dist_paths,
+    import_providers,
+    importlib_dist_details,
+    read_dist_details,
     resolve_dependencies,
     setup_resolvers,
 )
@@ -28,10 +38,16 @@ from .utils import (
 )
 
 
+def is_used(package, imported_names):
+    """Return True iff the package provides any of the given import names."""
+    providers = import_providers({package.package_name: package})
+    return not providers.keys().isdisjoint(imported_names)
+
+
 def test_package__empty_package__matches_nothing():
     p = Package("foobar", set(), IdentityMapping)  # no import names
     assert p.package_name == "foobar"
-    assert not p.is_used(["foobar"])
+    assert not is_used(p, ["foobar"])
 
 
 @pytest.mark.parametrize(
@@ -69,8 +85,8 @@ def test_package__identity_mapping(
     id_mapping = IdentityMapping()
     p = id_mapping.lookup_package(package_name)
     assert p.package_name == Package.normalize_name(package_name)
-    assert p.is_used(matching_imports)
-    assert not p.is_used(non_matching_imports)
+    assert is_used(p, matching_imports)
+    assert not is_used(p, non_matching_imports)
 
 
 @pytest.mark.parametrize(
@@ -143,8 +159,8 @@ def test_package__local_env_mapping(
     p = lpl.packages[normalized_name]
     assert p.package_name == normalized_name
     assert p.resolved_with is LocalPackageResolver
-    assert p.is_used(matching_imports)
-    assert not p.is_used(non_matching_imports)
+    assert is_used(p, matching_imports)
+    assert not is_used(p, non_matching_imports)
 
 
 @pytest.mark.parametrize(
@@ -229,6 +245,46 @@ def test_user_defined_mapping__well_formated_input_file__parses_correctly(
     assert actual == expect
 
 
+def test_accumulate_mappings__many_overlapping_entries__merges_all():
+    # 50k mapping entries, where a few packages recur in every mapping
+    mappings = [
+        (
+            {
+                **{f"popular-{j}": [f"import_{i}"] for j in range(5)},
+                **{f"package-{i}-{j}": [f"import_{i}_{j}"] for j in range(5)},
+            },
+            f"mapping{i}",
+        )
+        for i in range(5000)
+    ]
+    actual = accumulate_mappings(UserDefinedMapping, mappings)
+    assert len(actual) == 5 + 5000 * 5
+    popular = actual["popular_0"]
+    assert popular.import_names == {f"import_{i}" for i in range(5000)}
+    assert popular.debug_info == {f"mapping{i}": {f"import_{i}"} for i in range(5000)}
+    assert actual["package_42_3"] == Package(
+        "package_42_3",
+        {"import_42_3"},
+        UserDefinedMapping,
+        {"mapping42": {"import_42_3"}},
+    )
+
+
+def test_import_providers__maps_imports_and_stubs_to_dep_names():
+    resolved_deps = {
+        "Foo": Package("foo", {"foo", "shared"}, LocalPackageResolver),
+        "bar": Package("bar", {"bar", "shared"}, LocalPackageResolver),
+        "types-foo": Package("types_foo", {"foo-stubs"}, LocalPackageResolver),
+        "empty": Package("empty", set(), LocalPackageResolver),
+    }
+    assert import_providers(resolved_deps) == {
+        "foo": {"Foo", "types-foo"},
+        "foo-stubs": {"types-foo"},
+        "bar": {"bar"},
+        "shared": {"Foo", "bar"},
+    }
+
+
 def test_user_defined_mapping__input_is_no_file__raises_unparsable_path_exeption():
     with pytest.raises(UnparseablePathError):
         UserDefinedMapping({SAMPLE_PROJECTS_DIR})
@@ -331,3 +387,124 @@ def test_resolve_dependencies__unresolved_dependencies__UnresolvedDependenciesEr
 
     with pytest.raises(UnresolvedDependenciesError):
         resolve_dependencies(dep_names, setup_resolvers(install_deps=True))
+
+
+def test_read_dist_details__matches_importlib_metadata(fake_venv):
+    _venv_dir, site_dir = fake_venv({"with_top_level": {"foo", "bar"}})
+    # A package without top_level.txt, whose import names are inferred from RECORD
+    dist_info = site_dir / "record_only-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(
+        "Metadata-Version: 2.1\nName: Record-Only\nVersion: 1.0\n\nName: Other\n"
+    )
+    (dist_info / "RECORD").write_text(
+        dedent(
+            """\
+            record_only/__init__.py,sha256=abc,123
+            record_only/sub/mod.py,,
+            single_module.py,,
+            _ext.cpython-311-x86_64-linux-gnu.so,,
+            "with,comma.py",,
+            ./dotted/x.py,,
+            ../../bin/script,,
+            record_only-1.0.dist-info/RECORD,,
+            """
+        )
+    )
+    for path in ["record_only/sub/mod.py", "single_module.py", "with,comma.py"]:
+        (site_dir / path).parent.mkdir(parents=True, exist_ok=True)
+        (site_dir / path).touch()
+    package_dirs = [site_dir, *(Path(p) for p in sys.path if Path(p).is_dir())]
+    dist_paths = [path for d in package_dirs for path in find_dist_paths(d)]
+    assert dist_info in dist_paths
+
+    for dist_path in dist_paths:
+        name, version, imports = read_dist_details(dist_path)
+        expect = importlib_dist_details(PathDistribution(dist_path))
+        assert (name, version, set(imports)) == (expect[0], expect[1], set(expect[2]))
+
+
+def write_wheel(wheelhouse, filename, files):
+    wheelhouse.mkdir(exist_ok=True)
+    with zipfile.ZipFile(wheelhouse / filename, "w") as wheel:
+        for path, content in files.items():
+            wheel.writestr(path, content)
+
+
+def test_wheelhouse_resolver__reads_import_names_from_matching_wheels(tmp_path):
+    wheelhouse = tmp_path / "wheels"
+    write_wheel(
+        wheelhouse,
+        "Foo_Bar-1.0-py3-none-any.whl",
+        {
+            "foo_bar-1.0.dist-info/METADATA": "Name: Foo-Bar\nVersion: 1.0\n\n",
+            "foo_bar-1.0.dist-info/top_level.txt": "foo\nbar\n",
+            "foo/__init__.py": "",
+        },
+    )
+    write_wheel(
+        wheelhouse,
+        "no_top_level-2.0-cp311-cp311-manylinux_x86_64.whl",
+        {
+            "no_top_level/__init__.py": "",
+            "no_top_level/sub/mod.py": "",
+            "_speedups.cpython-311-x86_64-linux-gnu.so": "",
+            "no_top_level-2.0.data/scripts/tool": "",
+            "no_top_level-2.0.dist-info/METADATA": "Name: no-top-level\nVersion: 2.0\n",
+            "no_top_level-2.0.dist-info/RECORD": "",
+        },
+    )
+    write_wheel(wheelhouse, "broken-1.0-py3-none-any.whl", {"broken.py": ""})
+    (wheelhouse / "unrelated-1.0-py3-none-any.whl").write_text("not a zip file")
+
+    resolver = WheelhouseResolver(wheelhouse)
+    actual = resolver.lookup_packages({"foo.bar", "No_Top_Level", "broken", "other"})
+    assert actual == {
+        "foo.bar": Package(
+            "foo.bar",
+            {"foo", "bar"},
+            WheelhouseResolver,
+            {str(wheelhouse / "Foo_Bar-1.0-py3-none-any.whl"): {"foo", "bar"}},
+        ),
+        "No_Top_Level": Package(
+            "no_top_level",
+            {"no_top_level", "_speedups"},
+            WheelhouseResolver,
+            {
+                str(wheelhouse / "no_top_level-2.0-cp311-cp311-manylinux_x86_64.whl"): {
+                    "no_top_level",
+                    "_speedups",
+                },
+            },
+        ),
+    }
+
+
+def test_wheelhouse_resolver__not_a_directory__raises_unparsable_path_exception(
+    tmp_path,
+):
+    with pytest.raises(UnparseablePathError):
+        WheelhouseResolver(tmp_path / "missing")
+
+
+def test_resolve_dependencies__wheelhouse__comes_before_identity_mapping(
+    tmp_path, isolate_default_resolver
+):
+    isolate_default_resolver(default_sys_path_env_for_tests)
+    write_wheel(
+        tmp_path / "wheels",
+        "some_foo-1.0-py3-none-any.whl",
+        {
+            "some_foo-1.0.dist-info/METADATA": "Name: some-foo\nVersion: 1.0\n",
+            "some_foo-1.0.dist-info/top_level.txt": "foo\n",
+        },
+    )
+    resolvers = setup_resolvers(use_current_env=True, wheelhouse=tmp_path / "wheels")
+    actual = ignore_package_debug_info(
+        resolve_dependencies(["pip", "some-foo", "other"], resolvers)
+    )
+    assert actual == {
+        "pip": Package("pip", {"pip"}, SysPathPackageResolver),
+        "some-foo": Package("some-foo", {"foo"}, WheelhouseResolver),
+        "other": Package("other", {"other"}, IdentityMapping),
+    }
@@ -195,3 +195,17 @@ def test_real_project(request, project, experiment):
     )
 
     experiment.expectations.verify_analysis_json(analysis)
+
+
+@pytest.mark.parametrize(
+    "project",
+    [pytest.param(project, id=project.name) for project in ThirdPartyProject.collect()],
+)
+def test_real_project__native_and_isort_classification_agree(request, project):
+    project_dir = project.get_project_dir(request.config.cache)
+    args = ["--list-imports", "--detailed"]
+    native = run_fawltydeps_json(*args, venv_dir=None, cwd=project_dir)
+    with_isort = run_fawltydeps_json(
+        *args, "--use-isort", venv_dir=None, cwd=project_dir
+    )
+    assert with_isort["imports"] == native["imports"]
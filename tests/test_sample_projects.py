@@ -28,9 +28,11 @@ from typing import Iterator, List, Optional
 
 import pytest
 
+from fawltydeps.extract_imports import parse_sources
 from fawltydeps.main import Analysis
 from fawltydeps.settings import Action, Settings, print_toml_config
-from fawltydeps.types import TomlData
+from fawltydeps.traverse_project import find_sources
+from fawltydeps.types import CodeSource, TomlData
 from tests.utils import SAMPLE_PROJECTS_DIR
 
 from .project_helpers import BaseExperiment, BaseProject, parse_toml
@@ -140,3 +142,26 @@ def test_sample_projects(request, project, experiment, monkeypatch):
     print()
     analysis = Analysis.create(settings)
     experiment.expectations.verify_analysis(analysis)
+
+
+@pytest.mark.parametrize(
+    ("project", "experiment"),
+    [
+        pytest.param(project, experiment, id=experiment.name)
+        for project in SampleProject.collect()
+        for experiment in project.experiments
+    ],
+)
+def test_sample_projects__native_and_isort_classification_agree(
+    request, project, experiment, monkeypatch
+):
+    experiment.maybe_skip(project)
+    monkeypatch.chdir(project.path)
+    settings = experiment.build_settings(request.config.cache)
+    sources = [
+        src
+        for src in find_sources(settings, {CodeSource})
+        if isinstance(src, CodeSource) and isinstance(src.path, Path)
+    ]
+    native = list(parse_sources(sources))
+    assert list(parse_sources(sources, use_isort=True)) == native
@@ -56,6 +56,13 @@ EXPECT_DEFAULTS = dict(
     exclude_from=set(),
     verbosity=0,
     custom_mapping_file=set(),
+    jobs=1,
+    cache_dir=None,
+    max_install_cache_size=1024,
+    failed_install_ttl=24,
+    wheelhouse=None,
+    use_isort=False,
+    use_git_index=False,
 )
 
 
@@ -3,9 +3,12 @@
 import dataclasses
 import logging
 import os
+import shutil
+import subprocess
 import sys
+from functools import partial
 from pathlib import Path
-from typing import Callable, List, Optional, Set, Type
+from typing import Callable, Dict, List, Optional, Set, Type
 
 import pytest
 
@@ -17,6 +20,7 @@ from fawltydeps.types import (
     DepsSource,
     PathOrSpecial,
     PyEnvSource,
+    Source,
     UnparseablePathError,
 )
 
@@ -947,3 +951,81 @@ def test_find_sources_with_relative_paths(
         record.message for record in caplog.records if record.levelno == logging.WARNING
     ]
     assert_unordered_equivalence(actual_warnings, vector.expect_warnings)
+
+
+def _find_sources_by_type(settings: Settings) -> Dict[Type[Source], Set[Path]]:
+    ret: Dict[Type[Source], Set[Path]] = {}
+    for src in find_sources(settings):
+        assert isinstance(src, (CodeSource, DepsSource, PyEnvSource))
+        assert isinstance(src.path, Path)
+        ret.setdefault(type(src), set()).add(src.path)
+    return ret
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="requires git")
+def test_find_sources_with_git_index__finds_files_known_to_git(
+    write_tmp_files, fake_venv
+):
+    tmp_path = write_tmp_files(
+        {
+            ".gitignore": "build/\n.venv/\n",
+            "main.py": "import foo\n",
+            "pkg/mod.py": "import bar\n",
+            "requirements.txt": "foo\nbar\n",
+            ".hidden/hidden.py": "import baz\n",
+            "build/generated.py": "import baz\n",
+            "removed.py": "import baz\n",
+        }
+    )
+    _venv_dir, ignored_site_dir = fake_venv(
+        {"foo": {"foo"}}, venv_dir=tmp_path / ".venv"
+    )
+    _venv_dir, untracked_site_dir = fake_venv(
+        {"bar": {"bar"}}, venv_dir=tmp_path / "env"
+    )
+    git = partial(subprocess.run, cwd=tmp_path, check=True, capture_output=True)
+    git(["git", "init", "-q"])
+    git(["git", "add", ".gitignore", "main.py", "pkg", "requirements.txt", ".hidden"])
+    git(["git", "add", "--force", "build", "removed.py"])
+    git(["git", "-c", "user.name=Test", "-c", "user.email=test@example.com",
+         "commit", "-q", "-m", "Initial commit"])  # fmt: skip
+    git(["git", "rm", "-q", "--cached", "build/generated.py"])  # now ignored
+    (tmp_path / "removed.py").unlink()  # deleted, but still in git index
+    (tmp_path / "new.py").write_text("import foo\n")  # untracked
+
+    settings = Settings(
+        code={tmp_path}, deps={tmp_path}, pyenvs={tmp_path}, use_git_index=True
+    )
+    assert _find_sources_by_type(settings) == {
+        CodeSource: {
+            tmp_path / "main.py",
+            tmp_path / "pkg/mod.py",
+            tmp_path / "new.py",
+        },
+        DepsSource: {tmp_path / "requirements.txt"},
+        PyEnvSource: {ignored_site_dir, untracked_site_dir},
+    }
+
+    # Without git, we find the same sources, plus the ignored file
+    no_git = _find_sources_by_type(settings.copy(update={"use_git_index": False}))
+    assert no_git[CodeSource] == {tmp_path / "build/generated.py"} | {
+        tmp_path / "main.py",
+        tmp_path / "pkg/mod.py",
+        tmp_path / "new.py",
+    }
+
+
+def test_find_sources_with_git_index__outside_git__traverses_dirs(
+    fake_project, monkeypatch
+):
+    tmp_path = fake_project(
+        files_with_imports={"main.py": ["foo"], "sub/other.py": ["bar"]},
+        files_with_declared_deps={"requirements.txt": ["foo", "bar"]},
+        fake_venvs={"my_venv": {}},
+    )
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+    settings = Settings(code={tmp_path}, deps={tmp_path}, pyenvs={tmp_path})
+    expect = _find_sources_by_type(settings)
+    assert expect[CodeSource] == {tmp_path / "main.py", tmp_path / "sub/other.py"}
+    with_git = _find_sources_by_type(settings.copy(update={"use_git_index": True}))
+    assert with_git == expect
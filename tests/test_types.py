@@ -1,8 +1,9 @@
 """Verify behavior of our basic types."""
 
 import os
+import pickle
 import sys
-from dataclasses import FrozenInstanceError
+from dataclasses import FrozenInstanceError, asdict
 from pathlib import Path
 
 import pytest
@@ -122,6 +123,36 @@ def test_location_is_immutable():
         loc2.lineno += 5
 
 
+@pytest.mark.parametrize(
+    ("args", "expect"),
+    [
+        pytest.param(("<stdin>",), {"path": "<stdin>"}, id="path_only"),
+        pytest.param(
+            (Path("foo"), None, 4), {"path": Path("foo"), "lineno": 4}, id="no_cell"
+        ),
+        pytest.param(
+            (Path("foo"), 3, 4),
+            {"path": Path("foo"), "cellno": 3, "lineno": 4},
+            id="all_members",
+        ),
+    ],
+)
+def test_location__to_dict__includes_only_members_that_are_set(args, expect):
+    assert Location(*args).to_dict() == expect
+
+
+def test_location__pickle_roundtrip():
+    for args, *_ in testdata.values():
+        loc = Location(*args)
+        assert pickle.loads(pickle.dumps(loc)) == loc  # noqa: S301
+
+
+def test_parsedimport__pickle_roundtrip_and_asdict():
+    pi = ParsedImport("foo_module", Location(Path("foo.py"), lineno=2))
+    assert pickle.loads(pickle.dumps(pi)) == pi  # noqa: S301
+    assert asdict(pi) == {"name": "foo_module", "source": pi.source}
+
+
 def test_parsedimport_is_immutable():
     pi = ParsedImport("foo_module", Location(Path("foo.py")))
     with pytest.raises(FrozenInstanceError):